@@ -1,10 +1,16 @@
 from .webview import (
 	WebViewApplication, get_running_application, WebViewApplicationParameters,
-	WebViewWindow, WebViewWindowParameters, WebViewWindowState,
+	WebViewWindow, WebViewWindowParameters, WebViewWindowState, WebViewDispatchPriority,
 	WebViewVirtualHost, WebViewException
 )
 from .file_system_dialog import (
 	OpenFilePickerOptions ,SaveFilePickerOptions, DirectoryPickerOptions,
 	OpenFileResult, SaveFileResult, DirectoryResult,
 	FilterItem, set_description_of_all_files
-)
\ No newline at end of file
+)
+from .bridge import WebViewScriptError
+from .capture import CaptureFormat, CapturedFrame, FrameCapture, AsyncFrameSink, FileFrameSink
+from .memory import WebViewMemoryPolicy, WebViewMemoryAction
+from .store import KeyValueStore, StoreDurability
+from .serializer import register_serializer, unregister_serializer
+from .timeline import WebViewTimeline, NavigationRecord
\ No newline at end of file
@@ -2,11 +2,24 @@
 {
 	const COM_GUID = "1B9FCAB5-FB86-4D78-91DE-7BC2B4077E5B",
 		GET_OBJECT_PARAM = '{"kind":"request","options":{"operation":"get"}}',
-		{ stringify, parse } = JSON;
+		ENVELOPE_KEY = "__bsif_webview__",
+		MESSAGE_BRIDGE_READY = 1,
+		MESSAGE_NAVIGATION_TIMING = 2,
+		MESSAGE_CALL = 3,
+		MESSAGE_CALL_RESULT = 4,
+		MESSAGE_PUBLISH = 5,
+		MESSAGE_SUBSCRIBE = 6,
+		MESSAGE_UNSUBSCRIBE = 7,
+		LANE_INTERACTIVE = 0,
+		LANE_BACKGROUND = 1,
+		BRIDGE_BUSY = "busy",
+		BRIDGE_MALFORMED = "malformed",
+		{ stringify, parse } = JSON,
+		{ hasOwn } = Object;
 	const webview = new EmbeddedBrowserWebView,
-		postMessage = webview.postMessage.bind(webview),
+		postNativeMessage = webview.postMessage.bind(webview),
 		postRemoteObjectCall = webview.postRemoteObjectCall.bind(webview),
-		{ Error, MessageEvent } = window,
+		{ Error, MessageEvent, reportError } = window,
 		warn = console.warn.bind(console);
 	delete window.EmbeddedBrowserWebView;
 	class WebViewInvokeError extends Error {
@@ -15,6 +28,7 @@
 	class WebViewBridgeError extends Error {
 		name = this.constructor.name;
 	}
+	class WebViewBridgeBusyError extends WebViewBridgeError { }
 	class WebViewRemoteError extends Error {
 		constructor([name, message]) {
 			super(message)
@@ -28,23 +42,36 @@
 			result.result[COM_GUID] :
 			result.result;
 	}
+	function createCallError(error) {
+		const data = parse(error);
+		if (data === BRIDGE_BUSY) return new WebViewBridgeBusyError("Webview bridge is saturated, the call was rejected.");
+		if (data === BRIDGE_MALFORMED) return new WebViewBridgeError("Webview bridge received a malformed call.");
+		return data ?
+			new WebViewRemoteError(data) :
+			new WebViewBridgeError("Webview bridge cannot handle the value that remote function returned.");
+	}
 	const syncApi = Object.create(null),
 		asyncApi = Object.create(null),
-		bridge = getRemoteObjectProperty(0, "bridge").remoteObjectId,
-		syncCall = getRemoteObjectProperty(bridge, "SyncCall").remoteObjectId,
-		asyncCall = getRemoteObjectProperty(bridge, "AsyncCall").remoteObjectId;
+		backgroundApi = Object.create(null),
+		METHOD_NAMES = /*METHOD_NAMES*/[],
+		ASYNC_METHOD_NAMES = /*ASYNC_METHOD_NAMES*/[];
+	let bridge, syncCall, asyncCall;
+	function getBridge() {
+		return bridge ??= getRemoteObjectProperty(0, "bridge").remoteObjectId;
+	}
+	function getSyncCall() {
+		return syncCall ??= getRemoteObjectProperty(getBridge(), "SyncCall").remoteObjectId;
+	}
+	function getAsyncCall() {
+		return asyncCall ??= getRemoteObjectProperty(getBridge(), "AsyncCall").remoteObjectId;
+	}
 	function syncMethod(methodName, ...args) {
-		const result = postRemoteObjectCall(syncCall, "", stringify({
+		const result = postRemoteObjectCall(getSyncCall(), "", stringify({
 			kind: "request",
 			options: { operation: "apply" },
 			parameters: [methodName, stringify(args)]
 		}), null, true).parameters;
-		if ("error" in result) {
-			const data = parse(result.error);
-			throw data ?
-				new WebViewRemoteError(data) :
-				new WebViewBridgeError("Webview bridge cannot handle the value that remote function returned.");
-		}
+		if ("error" in result) throw createCallError(result.error);
 		return parse(result.result);
 	}
 	const asyncRequests = new Map,
@@ -54,10 +81,7 @@
 			controls = asyncRequests.get(id);
 		asyncRequests.delete(id);
 		if ("error" in result) {
-			const data = parse(result.error);
-			controls.reject(data ?
-				new WebViewRemoteError(data) :
-				new WebViewBridgeError("Webview bridge cannot handle the value that remote function returned."));
+			controls.reject(createCallError(result.error));
 		} else {
 			controls.resolve(parse(result.result));
 		}
@@ -74,19 +98,72 @@
 		asyncRequests.set(id, controls);
 		return [id, controls.promise];
 	}
-	function asyncMethod(methodName, ...args) {
-		args = stringify(args);
-		const [id, promise] = generateAsyncRequestId();
-		var result = postRemoteObjectCall(asyncCall, "", stringify({
+	function asyncMethod(lane, methodName, ...args) {
+		args = stringify([lane, args]);
+		const target = getAsyncCall(),
+			[id, promise] = generateAsyncRequestId();
+		postRemoteObjectCall(target, "", stringify({
 			kind: "request",
 			options: { operation: "apply" },
 			parameters: [methodName, args]
 		}), id, false);
 		return promise;
 	}
-	for (const name of getRemoteObjectProperty(bridge, "MethodNames")) {
-		syncApi[name] = syncMethod.bind(null, name);
-		asyncApi[name] = asyncMethod.bind(null, name);
+	for (const name of METHOD_NAMES) syncApi[name] = syncMethod.bind(null, name);
+	for (const name of [...METHOD_NAMES, ...ASYNC_METHOD_NAMES]) {
+		asyncApi[name] = asyncMethod.bind(null, LANE_INTERACTIVE, name);
+		backgroundApi[name] = asyncMethod.bind(null, LANE_BACKGROUND, name);
+	}
+	function postMessage(message) {
+		postNativeMessage(message);
+	}
+	function postInternalMessage(...message) {
+		postNativeMessage({ [ENVELOPE_KEY]: message });
+	}
+	const exposedFunctions = new Map;
+	async function handleCall(id, name, args) {
+		try {
+			const fn = exposedFunctions.get(name);
+			if (!fn) throw new ReferenceError(`Function '${name}' is not exposed.`);
+			postInternalMessage(MESSAGE_CALL_RESULT, id, true, await fn(...args));
+		} catch (error) {
+			postInternalMessage(MESSAGE_CALL_RESULT, id, false, [error?.name ?? "Error", String(error?.message ?? error)]);
+		}
+	}
+	function expose(name, fn) {
+		if (typeof fn != "function") throw new TypeError("Argument 'fn' must be a function.");
+		exposedFunctions.set(String(name), fn);
+	}
+	function unexpose(name) {
+		return exposedFunctions.delete(String(name));
+	}
+	const topicListeners = new Map;
+	function subscribe(topic, listener) {
+		if (typeof listener != "function") throw new TypeError("Argument 'listener' must be a function.");
+		topic = String(topic);
+		let listeners = topicListeners.get(topic);
+		if (!listeners) {
+			topicListeners.set(topic, listeners = new Set);
+			postInternalMessage(MESSAGE_SUBSCRIBE, topic);
+		}
+		listeners.add(listener);
+		return unsubscribe.bind(null, topic, listener);
+	}
+	function unsubscribe(topic, listener) {
+		topic = String(topic);
+		const listeners = topicListeners.get(topic);
+		if (!listeners?.delete(listener)) return false;
+		if (!listeners.size) {
+			topicListeners.delete(topic);
+			postInternalMessage(MESSAGE_UNSUBSCRIBE, topic);
+		}
+		return true;
+	}
+	function dispatchPublish(topic, data) {
+		const listeners = topicListeners.get(topic);
+		if (listeners) for (const listener of listeners) {
+			try { listener(data, topic); } catch (error) { reportError(error); }
+		}
 	}
 	class WebView extends EventTarget {
 		static #flag = false;
@@ -97,14 +174,31 @@
 			Object.freeze(this);
 			const dispatchMessage = this.dispatchEvent.bind(this);
 			webview.addEventListener("message", function (event) {
-				dispatchMessage(new MessageEvent("message", { data: parse(event.data) }));
+				const data = parse(event.data);
+				if (data === null || typeof data != "object" || !hasOwn(data, ENVELOPE_KEY)) {
+					dispatchMessage(new MessageEvent("message", { data }));
+					return;
+				}
+				const message = data[ENVELOPE_KEY];
+				switch (message[0]) {
+					case MESSAGE_CALL:
+						handleCall(message[1], message[2], message[3]);
+						break;
+					case MESSAGE_PUBLISH:
+						dispatchPublish(message[1], message[2]);
+				}
 			});
 		}
 		syncApi = syncApi;
 		asyncApi = asyncApi;
+		backgroundApi = backgroundApi;
 		static {
 			const { prototype } = this;
 			prototype.postMessage = postMessage;
+			prototype.expose = expose;
+			prototype.unexpose = unexpose;
+			prototype.subscribe = subscribe;
+			prototype.unsubscribe = unsubscribe;
 			Object.defineProperty(prototype, Symbol.toStringTag, {
 				value: this.name,
 				configurable: true
@@ -112,5 +206,14 @@
 		}
 	}
 	window.webview = new WebView;
+	if (window === window.top) {
+		postInternalMessage(MESSAGE_BRIDGE_READY);
+		addEventListener("load", function () {
+			setTimeout(function () {
+				const [entry] = performance.getEntriesByType("navigation");
+				if (entry) postInternalMessage(MESSAGE_NAVIGATION_TIMING, entry.toJSON());
+			});
+		}, { once: true });
+	}
 	Object.getPrototypeOf(Uint8Array).prototype.toJSON = function toJSON() { return Array.from(this) };
 }
\ No newline at end of file
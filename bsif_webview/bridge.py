@@ -1,12 +1,16 @@
-from asyncio import iscoroutine, new_event_loop
-from threading import Thread
+from asyncio import AbstractEventLoop, Future, get_running_loop, iscoroutine, new_event_loop, run_coroutine_threadsafe
+from collections import deque
+from concurrent.futures import Future as ConcurrentFuture
+from itertools import count
+from threading import Condition, Lock, Thread
 from traceback import print_exception
 from .helper import LIBRARIES, PACKAGE
 from clr import AddReference
 from inspect import isbuiltin, isfunction, ismethod
 from json import dumps, loads
 from os.path import join
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Coroutine, Deque, Dict, Iterable, List, Optional, Tuple
+from .serializer import encode
 
 AddReference(join(LIBRARIES, 'BSIF.WebView2Bridge.dll'))
 with open(join(PACKAGE, "bridge.js")) as file: bridge_script = file.read()
@@ -15,7 +19,36 @@ from System import Exception as CSException # type: ignore
 from System.Threading.Tasks import TaskCompletionSource # type: ignore
 from Microsoft.Web.WebView2.Core import CoreWebView2 # type: ignore
 
-def serialize_object(object: object): return object.__dict__
+ENVELOPE_KEY = "__bsif_webview__"
+MESSAGE_BRIDGE_READY = 1
+MESSAGE_NAVIGATION_TIMING = 2
+MESSAGE_CALL = 3
+MESSAGE_CALL_RESULT = 4
+MESSAGE_PUBLISH = 5
+MESSAGE_SUBSCRIBE = 6
+MESSAGE_UNSUBSCRIBE = 7
+
+LANE_INTERACTIVE = 0
+LANE_BACKGROUND = 1
+LANE_LOOP_NAMES = ("WebViewBridgeLoop", "WebViewBridgeBackgroundLoop")
+BRIDGE_BUSY_ERROR = dumps("busy")
+BRIDGE_MALFORMED_ERROR = dumps("malformed")
+WORKER_IDLE_TIMEOUT = 30
+
+class WebViewScriptError(Exception):
+	def __init__(self, name: str, message: str):
+		super().__init__(message)
+		self.name = name
+
+def envelope(kind: int, *payload: Any):
+	return encode({ENVELOPE_KEY: [kind, *payload]})
+
+def generate_bridge_script(method_names: Iterable[str], async_method_names: Iterable[str] = ()):
+	return bridge_script.replace(
+		"/*METHOD_NAMES*/[]", dumps(list(method_names), ensure_ascii=False), 1
+	).replace(
+		"/*ASYNC_METHOD_NAMES*/[]", dumps(list(async_method_names), ensure_ascii=False), 1
+	)
 
 def pick_methods(object: object) -> Dict[str, Callable]:
 	methods = {}
@@ -31,40 +64,254 @@ def pick_dictionary_methods(object: Dict[str, Any]) -> Dict[str, Callable]:
 		if ismethod(value) or isfunction(value) or isbuiltin(value): methods[key] = value
 	return methods
 
-def async_call_thread(function: Callable, args_json: str, async_object: TaskCompletionSource ):
-	try:
-		result=function(*loads(args_json))
-		if (iscoroutine(result)): result=new_event_loop().run_until_complete(result)
-	except Exception as error:
-		async_object.SetException(CSException(dumps([error.__class__.__name__, str(error)], ensure_ascii=False)))
-		print_exception(error)
-		return
-	try: async_object.SetResult(dumps(result, ensure_ascii=False, default=serialize_object))
+def _reject_call(async_object: TaskCompletionSource, error: Exception):
+	async_object.SetException(CSException(dumps([error.__class__.__name__, str(error)], ensure_ascii=False)))
+	print_exception(error)
+def _resolve_call(async_object: TaskCompletionSource, result: Any):
+	try: async_object.SetResult(encode(result))
 	except BaseException as error:
 		async_object.SetException(CSException("null"))
 		print_exception(error)
 
+async def async_call_coroutine(coroutine: Coroutine, async_object: TaskCompletionSource):
+	try: result = await coroutine
+	except Exception as error:
+		_reject_call(async_object, error)
+		return
+	_resolve_call(async_object, result)
+def async_call_thread(function: Callable, args: List[Any], async_object: TaskCompletionSource ):
+	try: result = function(*args)
+	except Exception as error:
+		_reject_call(async_object, error)
+		return None
+	if iscoroutine(result): return async_call_coroutine(result, async_object)
+	_resolve_call(async_object, result)
+	return None
+
+def parse_async_call(args_json: str) -> Optional[Tuple[int, List[Any]]]:
+	try: call = loads(args_json)
+	except ValueError: return None
+	if type(call) is not list or len(call) != 2: return None
+	[lane, args] = call
+	if type(lane) is not int or lane not in (LANE_INTERACTIVE, LANE_BACKGROUND) or type(args) is not list: return None
+	return lane, args
+
+def _settle_script_call(future: Future, success: bool, value: Any):
+	if future.done(): return
+	if success: future.set_result(value)
+	else: future.set_exception(WebViewScriptError(*value))
+
+class ScriptCallRegistry:
+	def __init__(self):
+		self.__lock = Lock()
+		self.__calls: Dict[int, Future] = {}
+		self.__ids = count(1)
+
+	def create(self) -> Tuple[int, Future]:
+		future = get_running_loop().create_future()
+		with self.__lock:
+			id = next(self.__ids)
+			self.__calls[id] = future
+		future.add_done_callback(lambda _: self.__discard(id))
+		return id, future
+	def __discard(self, id: int):
+		with self.__lock: self.__calls.pop(id, None)
+	def settle(self, id: int, success: bool, value: Any):
+		with self.__lock: future = self.__calls.pop(id, None)
+		if future is not None: future.get_loop().call_soon_threadsafe(_settle_script_call, future, success, value)
+	def reject_all(self, name: str, message: str):
+		with self.__lock:
+			calls = self.__calls
+			self.__calls = {}
+		for future in calls.values(): future.get_loop().call_soon_threadsafe(_settle_script_call, future, False, (name, message))
+	@property
+	def pending(self):
+		with self.__lock: return len(self.__calls)
+
+class BridgeScheduler:
+	def __init__(self, max_workers: int = 16, max_in_flight: int = 256, max_background_workers: Optional[int] = None):
+		if max_workers < 1 or max_in_flight < 1: raise ValueError("Limits must be positive.")
+		if max_background_workers is None: max_background_workers = max(1, max_workers >> 1)
+		if not 0 < max_background_workers <= max_workers: raise ValueError("Argument 'max_background_workers' must be between 1 and 'max_workers'.")
+		self.__max_workers = max_workers
+		self.__max_background_workers = max_background_workers
+		self.__limits = (max_in_flight, max(1, max_in_flight >> 1))
+		self.__condition = Condition()
+		self.__queues: Tuple[Deque[Tuple[Callable, Tuple]], Deque[Tuple[Callable, Tuple]]] = (deque(), deque())
+		self.__workers = 0
+		self.__idle = 0
+		self.__background_running = 0
+		self.__in_flight = 0
+		self.__accepted = [0, 0]
+		self.__rejected = [0, 0]
+		self.__loops: List[Optional[AbstractEventLoop]] = [None, None]
+
+	def __runnable(self):
+		[interactive, background] = self.__queues
+		return len(interactive) + (len(background) if self.__background_running < self.__max_background_workers else 0)
+	def __wake(self):
+		runnable = self.__runnable()
+		if not runnable: return
+		if self.__idle: self.__condition.notify(runnable)
+		if runnable > self.__idle and self.__workers < self.__max_workers:
+			self.__workers += 1
+			Thread(None, self.__worker, "WebViewBridgeWorker", daemon=True).start()
+
+	def submit(self, lane: int, function: Callable, args: Tuple):
+		with self.__condition:
+			if self.__in_flight >= self.__limits[lane]:
+				self.__rejected[lane] += 1
+				return False
+			self.__in_flight += 1
+			self.__accepted[lane] += 1
+			self.__queues[lane].append((function, args))
+			self.__wake()
+		return True
+
+	def __take(self):
+		[interactive, background] = self.__queues
+		if interactive: return LANE_INTERACTIVE, interactive.popleft()
+		if background and self.__background_running < self.__max_background_workers:
+			self.__background_running += 1
+			return LANE_BACKGROUND, background.popleft()
+		return None
+	def __worker(self):
+		condition = self.__condition
+		while True:
+			with condition:
+				while (task := self.__take()) is None:
+					self.__idle += 1
+					notified = condition.wait(WORKER_IDLE_TIMEOUT)
+					self.__idle -= 1
+					if not notified and not self.__runnable():
+						self.__workers -= 1
+						return
+			[lane, [function, args]] = task
+			try: pending = function(*args)
+			except BaseException as error:
+				print_exception(error)
+				pending = None
+			if pending is not None: self.__run_coroutine(lane, pending)
+			with condition:
+				if lane == LANE_BACKGROUND: self.__background_running -= 1
+				if pending is None: self.__in_flight -= 1
+
+	def __run_coroutine(self, lane: int, coroutine: Coroutine):
+		with self.__condition:
+			loop = self.__loops[lane]
+			if loop is None:
+				loop = self.__loops[lane] = new_event_loop()
+				Thread(None, loop.run_forever, LANE_LOOP_NAMES[lane], daemon=True).start()
+		run_coroutine_threadsafe(coroutine, loop).add_done_callback(self.__on_coroutine_done)
+	def __on_coroutine_done(self, future: ConcurrentFuture):
+		if not future.cancelled() and future.exception() is not None: print_exception(future.exception())
+		with self.__condition: self.__in_flight -= 1
+
+	@property
+	def statistics(self):
+		with self.__condition:
+			return {
+				"workers": self.__workers,
+				"background_running": self.__background_running,
+				"in_flight": self.__in_flight,
+				"queued": len(self.__queues[LANE_INTERACTIVE]) + len(self.__queues[LANE_BACKGROUND]),
+				"accepted": {"interactive": self.__accepted[LANE_INTERACTIVE], "background": self.__accepted[LANE_BACKGROUND]},
+				"rejected": {"interactive": self.__rejected[LANE_INTERACTIVE], "background": self.__rejected[LANE_BACKGROUND]}
+			}
+
+type NativeMethod = Callable[[List[Any], Callable[[bool, Any], None]], None]
+
+def _native_completion(async_object: TaskCompletionSource):
+	def complete(success: bool, value: Any):
+		if not success:
+			async_object.SetException(CSException(dumps([value.__class__.__name__, str(value)], ensure_ascii=False)))
+			return
+		try: async_object.SetResult(encode(value))
+		except BaseException as error:
+			async_object.SetException(CSException("null"))
+			print_exception(error)
+	return complete
+
 class Bridge:
-	def __init__(self, core: CoreWebView2, api: object):
+	def __init__(self, core: CoreWebView2, api: object, scheduler: BridgeScheduler, max_in_flight: int = 64, on_call: Optional[Callable[[], Any]] = None, natives: Optional[Dict[str, NativeMethod]] = None):
+		self.__on_call = on_call
+		self.__scheduler = scheduler
+		self.__max_in_flight = max_in_flight
+		self.__in_flight = 0
+		self.__rejected = 0
+		self.__lock = Lock()
 		api = self.__api = (pick_dictionary_methods if type(api) is dict else pick_methods)(api) # type: ignore
+		self.__natives = {name: method for name, method in natives.items() if name not in api} if natives else {}
+		method_names = [*api.keys(), *self.__natives.keys()]
 		core.RemoveScriptToExecuteOnDocumentCreated("1")
-		core.AddScriptToExecuteOnDocumentCreatedAsync(bridge_script)
+		core.AddScriptToExecuteOnDocumentCreatedAsync(generate_bridge_script(api.keys(), self.__natives.keys()))
 		core.AddHostObjectToScript("bridge", WebView2Bridge(
 			WebView2Bridge.SyncCaller(self.__sync_call_handler),
 			WebView2Bridge.AsyncCaller(self.__async_call_handler),
-			api.keys()
+			method_names
 		))
 	
 	def __sync_call_handler(self, method_name: str, args_json: str):
+		if self.__on_call: self.__on_call()
+		if method_name in self.__natives: raise Exception(dumps(["TypeError", f"Method '{method_name}' can only be called asynchronously."]))
 		try:
 			result = self.__api[method_name](*loads(args_json))
 		except Exception as error:
 			print_exception(error)
 			raise Exception(dumps([error.__class__.__name__, str(error)], ensure_ascii=False))
 		try:
-			return dumps(result, ensure_ascii=False, default=serialize_object)
+			return encode(result)
 		except BaseException as error:
 			print_exception(error)
 			raise Exception("null")
 	def __async_call_handler(self, method_name: str, args_json: str, async_object):
-		Thread(None, async_call_thread, method_name, (self.__api[method_name], args_json, async_object), daemon=True).start()
+		if self.__on_call: self.__on_call()
+		call = parse_async_call(args_json)
+		if call is None:
+			async_object.SetException(CSException(BRIDGE_MALFORMED_ERROR))
+			return
+		[lane, args] = call
+		native = self.__natives.get(method_name)
+		if native:
+			complete = _native_completion(async_object)
+			try: native(args, complete)
+			except Exception as error:
+				print_exception(error)
+				complete(False, error)
+			return
+		function = self.__api[method_name]
+		with self.__lock:
+			admitted = self.__in_flight < self.__max_in_flight
+			if admitted: self.__in_flight += 1
+			else: self.__rejected += 1
+		if admitted:
+			if self.__scheduler.submit(lane, self.__async_call, (function, args, async_object)): return
+			with self.__lock:
+				self.__in_flight -= 1
+				self.__rejected += 1
+		async_object.SetException(CSException(BRIDGE_BUSY_ERROR))
+	def __async_call(self, function: Callable, args: List[Any], async_object: TaskCompletionSource):
+		pending = None
+		try:
+			pending = async_call_thread(function, args, async_object)
+			if pending is not None: return self.__finish_after(pending)
+		finally:
+			if pending is None:
+				with self.__lock: self.__in_flight -= 1
+	async def __finish_after(self, pending: Coroutine):
+		try: await pending
+		finally:
+			with self.__lock: self.__in_flight -= 1
+
+	@property
+	def statistics(self):
+		with self.__lock:
+			return {"in_flight": self.__in_flight, "rejected": self.__rejected}
+	@property
+	def handlers(self): return len(self.__api) + len(self.__natives)
+
+	def release(self, core: CoreWebView2):
+		self.__api = {}
+		self.__natives = {}
+		self.__on_call = None
+		core.RemoveHostObjectFromScript("bridge")
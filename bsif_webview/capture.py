@@ -0,0 +1,168 @@
+from asyncio import AbstractEventLoop, Queue as AsyncQueue
+from enum import Enum
+from os import makedirs
+from os.path import join
+from queue import Queue
+from threading import Lock, Thread
+from time import perf_counter
+from traceback import print_exception
+from typing import Optional, Protocol
+
+from System import Action, TimeSpan # type: ignore
+from System.IO import MemoryStream # type: ignore
+from System.Threading.Tasks import Task as CSTask # type: ignore
+from System.Windows.Threading import Dispatcher, DispatcherPriority, DispatcherTimer # type: ignore
+from Microsoft.Web.WebView2.Core import CoreWebView2, CoreWebView2CapturePreviewImageFormat # type: ignore
+
+class CaptureFormat(Enum):
+	PNG = CoreWebView2CapturePreviewImageFormat.Png
+	JPEG = CoreWebView2CapturePreviewImageFormat.Jpeg
+
+_extensions = {CaptureFormat.PNG: "png", CaptureFormat.JPEG: "jpg"}
+
+class CapturedFrame:
+	def __init__(self, index: int, timestamp: float, format: CaptureFormat, data: bytes):
+		self.index = index
+		self.timestamp = timestamp
+		self.format = format
+		self.data = data
+
+class FrameSink(Protocol):
+	def offer(self, frame: CapturedFrame) -> bool: ...
+	def close(self) -> None: ...
+
+class AsyncFrameSink:
+	def __init__(self, loop: AbstractEventLoop, max_pending: int = 2):
+		self.__loop = loop
+		self.__max_pending = max_pending
+		self.__pending = 0
+		self.__lock = Lock()
+		self.__queue: AsyncQueue[Optional[CapturedFrame]] = AsyncQueue()
+		self.__closed = False
+
+	def offer(self, frame: CapturedFrame):
+		with self.__lock:
+			if self.__closed or self.__pending >= self.__max_pending: return False
+			self.__pending += 1
+		self.__loop.call_soon_threadsafe(self.__queue.put_nowait, frame)
+		return True
+	def close(self):
+		with self.__lock:
+			if self.__closed: return
+			self.__closed = True
+		self.__loop.call_soon_threadsafe(self.__queue.put_nowait, None)
+
+	def __aiter__(self): return self
+	async def __anext__(self):
+		frame = await self.__queue.get()
+		if frame is None:
+			self.__queue.put_nowait(None)
+			raise StopAsyncIteration
+		with self.__lock: self.__pending -= 1
+		return frame
+
+class FileFrameSink:
+	def __init__(self, directory: str, max_pending: int = 8, name_format: str = "frame_{index:06d}.{extension}"):
+		makedirs(directory, exist_ok=True)
+		self.directory = directory
+		self.name_format = name_format
+		self.__max_pending = max_pending
+		self.__closed = False
+		self.__queue: Queue[Optional[CapturedFrame]] = Queue()
+		self.__thread = Thread(target=self.__write, name="WebViewFrameWriter", daemon=True)
+		self.__thread.start()
+
+	def __write(self):
+		queue = self.__queue
+		while (frame := queue.get()) is not None:
+			try:
+				with open(join(self.directory, self.name_format.format(index=frame.index, extension=_extensions[frame.format])), "wb") as file: file.write(frame.data)
+			except Exception as e: print_exception(e)
+	def offer(self, frame: CapturedFrame):
+		if self.__closed or self.__queue.qsize() >= self.__max_pending: return False
+		self.__queue.put_nowait(frame)
+		return True
+	def close(self):
+		if self.__closed: return
+		self.__closed = True
+		self.__queue.put_nowait(None)
+	def join(self, timeout: Optional[float] = None):
+		self.__thread.join(timeout)
+		return not self.__thread.is_alive()
+
+class FrameCapture:
+	def __init__(self, core: CoreWebView2, sink: FrameSink, fps: float = 10, format = CaptureFormat.PNG):
+		if fps <= 0: raise ValueError("Argument 'fps' must be positive.")
+		if not isinstance(format, CaptureFormat): raise TypeError("Argument 'format' must be a CaptureFormat.")
+		self.fps = fps
+		self.format = format
+		self.sink = sink
+		self.captured = 0
+		self.dropped = 0
+		self.__core = core
+		self.__stream = MemoryStream()
+		self.__busy = False
+		self.__stopped = False
+		self.__index = 0
+		self.__requested_at = 0.0
+		self.__timer: Optional[DispatcherTimer] = None
+		self.__lock = Lock()
+		self.__completed = Action[CSTask](self.__on_captured)
+
+	@property
+	def running(self): return self.__timer is not None
+
+	def start(self, dispatcher: Dispatcher):
+		if self.__stopped: raise RuntimeError("Capture is already stopped.")
+		if self.__timer: return
+		timer = self.__timer = DispatcherTimer(DispatcherPriority.Background, dispatcher)
+		timer.Interval = TimeSpan.FromSeconds(1 / self.fps)
+		timer.Tick += lambda *_: self.tick()
+		timer.Start()
+	def stop(self):
+		timer = self.__timer
+		if timer:
+			timer.Stop()
+			self.__timer = None
+		with self.__lock:
+			if self.__stopped: return
+			self.__stopped = True
+			busy = self.__busy
+		if not busy: self.sink.close()
+
+	def tick(self):
+		with self.__lock:
+			if self.__stopped: return
+			if self.__busy:
+				self.dropped += 1
+				return
+			self.__busy = True
+			self.__requested_at = perf_counter()
+		stream = self.__stream
+		stream.SetLength(0)
+		try: self.__core.CapturePreviewAsync(self.format.value, stream).ContinueWith(self.__completed)
+		except Exception as e:
+			with self.__lock: self.__busy = False
+			print_exception(e)
+	def __on_captured(self, task: CSTask):
+		try:
+			if task.IsFaulted: print_exception(task.Exception)
+			else:
+				stream = self.__stream
+				data = bytes(memoryview(stream.GetBuffer())[:stream.Length])
+				frame = CapturedFrame(self.__index, self.__requested_at, self.format, data)
+				self.__index += 1
+				offered = self.sink.offer(frame)
+				with self.__lock:
+					if offered: self.captured += 1
+					else: self.dropped += 1
+		except Exception as e: print_exception(e)
+		finally:
+			with self.__lock:
+				self.__busy = False
+				stopped = self.__stopped
+			if stopped: self.sink.close()
+
+	def __aiter__(self):
+		if not isinstance(self.sink, AsyncFrameSink): raise TypeError("Capture sink is not asynchronous.")
+		return self.sink
@@ -0,0 +1,130 @@
+from mimetypes import guess_type
+from os.path import basename, getsize
+from re import compile
+from secrets import token_urlsafe
+from threading import Lock, Thread
+from time import monotonic
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+from System.IO import FileAccess, FileMode, FileOptions, FileShare, FileStream, MemoryStream, SeekOrigin # type: ignore
+from Microsoft.Web.WebView2.Core import CoreWebView2Environment, CoreWebView2WebResourceRequestedEventArgs # type: ignore
+
+FILE_RESOURCE_HOST = "file.webview.internal"
+FILE_RESOURCE_ORIGIN = f"https://{FILE_RESOURCE_HOST}/"
+FILE_RESOURCE_FILTER = FILE_RESOURCE_ORIGIN + "*"
+RANGE_REGEX = compile(r"^bytes=(\d*)-(\d*)$")
+MAX_BUFFERED_RANGE = 8 << 20
+STREAM_BUFFER_SIZE = 1 << 16
+COMMON_HEADERS = "Access-Control-Allow-Origin: *\r\nAccept-Ranges: bytes\r\nCache-Control: no-store"
+
+def _token(url: str):
+	parts = urlsplit(url).path.split("/", 2)
+	return parts[1] if len(parts) > 1 else ""
+
+def is_file_resource(url: str): return urlsplit(url).hostname == FILE_RESOURCE_HOST
+
+class FileResource:
+	def __init__(self, path: str, ttl: float):
+		self.path = path
+		self.ttl = ttl
+		self.expires = monotonic() + ttl
+
+class FileResourceRegistry:
+	def __init__(self, ttl: float = 600):
+		self.ttl = ttl
+		self.__lock = Lock()
+		self.__resources: Dict[str, FileResource] = {}
+
+	def __sweep(self, now: float):
+		expired = [token for token, resource in self.__resources.items() if resource.expires <= now]
+		for token in expired: del self.__resources[token]
+	def register(self, path: str, ttl: Optional[float] = None):
+		token = token_urlsafe(18)
+		with self.__lock:
+			self.__sweep(monotonic())
+			self.__resources[token] = FileResource(path, self.ttl if ttl is None else ttl)
+		return f"{FILE_RESOURCE_ORIGIN}{token}/{quote(basename(path))}"
+	def revoke(self, url: str):
+		token = _token(url)
+		with self.__lock: return self.__resources.pop(token, None) is not None
+	def clear(self):
+		with self.__lock: self.__resources.clear()
+	def resolve(self, url: str):
+		if not is_file_resource(url): return None
+		token = _token(url)
+		now = monotonic()
+		with self.__lock:
+			resource = self.__resources.get(token)
+			if resource is None: return None
+			if resource.expires <= now:
+				del self.__resources[token]
+				return None
+			resource.expires = now + resource.ttl
+			return resource.path
+	def __len__(self):
+		with self.__lock: return len(self.__resources)
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+	if not header: return None
+	match = RANGE_REGEX.match(header.strip())
+	if not match: return None
+	[start, end] = match.groups()
+	if not start:
+		if not end: return None
+		length = min(int(end), size)
+		if not length: raise ValueError("Unsatisfiable range.")
+		return (size - length, size - 1)
+	start = int(start)
+	if start >= size or end and int(end) < start: raise ValueError("Unsatisfiable range.")
+	return (start, min(int(end), size - 1) if end else size - 1)
+
+def _not_found(environment: CoreWebView2Environment):
+	return environment.CreateWebResourceResponse(None, 404, "Not Found", COMMON_HEADERS)
+
+def _read_range(path: str, start: int, length: int):
+	try:
+		with open(path, "rb") as file:
+			file.seek(start)
+			data = file.read(length)
+	except OSError: return None
+	return data if len(data) == length else None
+
+def respond_file_request(args: CoreWebView2WebResourceRequestedEventArgs, environment: CoreWebView2Environment, path: Optional[str], post: Callable[[Callable[[], Any]], Any]):
+	if path is None:
+		args.Response = _not_found(environment)
+		return
+	headers = args.Request.Headers
+	try:
+		size = getsize(path)
+		byte_range = parse_range(headers.GetHeader("Range") if headers.Contains("Range") else None, size)
+	except ValueError:
+		args.Response = environment.CreateWebResourceResponse(None, 416, "Range Not Satisfiable", f"{COMMON_HEADERS}\r\nContent-Range: bytes */{size}")
+		return
+	except OSError:
+		args.Response = _not_found(environment)
+		return
+	response_headers = f"{COMMON_HEADERS}\r\nContent-Type: {guess_type(path)[0] or 'application/octet-stream'}"
+	if byte_range is None:
+		stream = FileStream(path, FileMode.Open, FileAccess.Read, FileShare.Read, STREAM_BUFFER_SIZE, FileOptions.SequentialScan)
+		args.Response = environment.CreateWebResourceResponse(stream, 200, "OK", f"{response_headers}\r\nContent-Length: {size}")
+		return
+	[start, end] = byte_range
+	if end == size - 1:
+		stream = FileStream(path, FileMode.Open, FileAccess.Read, FileShare.Read, STREAM_BUFFER_SIZE, FileOptions.SequentialScan)
+		stream.Seek(start, SeekOrigin.Begin)
+		args.Response = environment.CreateWebResourceResponse(stream, 206, "Partial Content", f"{response_headers}\r\nContent-Length: {size - start}\r\nContent-Range: bytes {start}-{end}/{size}")
+		return
+	end = min(end, start + MAX_BUFFERED_RANGE - 1)
+	deferral = args.GetDeferral()
+	def complete(data: Optional[bytes]):
+		try:
+			args.Response = _not_found(environment) if data is None else environment.CreateWebResourceResponse(
+				MemoryStream(data), 206, "Partial Content",
+				f"{response_headers}\r\nContent-Length: {len(data)}\r\nContent-Range: bytes {start}-{end}/{size}"
+			)
+		finally: deferral.Complete()
+	def read():
+		data = _read_range(path, start, end - start + 1)
+		post(lambda: complete(data))
+	Thread(target=read, name="WebViewFileRangeReader", daemon=True).start()
@@ -1,4 +1,5 @@
-from typing import Iterable, List, Optional, Tuple, Type, TypedDict
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Tuple, Type, TypedDict
 from re import compile
 from os.path import join
 from .helper import LIBRARIES
@@ -29,21 +30,24 @@ def set_description_of_all_files(text: str):
 		raise TypeError("Argument 'text' must be a string.")
 	description_of_all_files = text
 
+@lru_cache(64)
+def build_filters(filters: Tuple[Tuple[str, Tuple[str, ...]], ...], all_files_description: Optional[str]) -> Tuple[CommonFileDialogFilter, ...]:
+	result = []
+	for [description, extensions] in filters:
+		if not extensions:
+			raise ValueError("Extensions cannot be empty.")
+		for name in extensions:
+			if EXTENSION_REGEX.search(name):
+				raise ValueError("Extension cannot contain contain special characters.")
+		result.append(CommonFileDialogFilter(description, ";".join(extensions)))
+	if all_files_description is not None:
+		result.append(CommonFileDialogFilter(all_files_description, "*.*"))
+	return tuple(result)
+
 def parse_filters(collection: CommonFileDialogFilterCollection, filters: Optional[Iterable[FilterItem]], exclude_filter_of_all_files: bool):
-	if filters:
-		for item in filters:
-			description = item.get("description", None)
-			if not description: description = ""
-			extensions = item.get("extensions", None)
-			if not extensions:
-				raise ValueError("Extensions cannot be empty.")
-			extensions = tuple(extensions)
-			for name in extensions:
-				if EXTENSION_REGEX.search(name):
-					raise ValueError("Extension cannot contain contain special characters.")
-			collection.Add(CommonFileDialogFilter(description, ";".join(extensions)))
-	if not exclude_filter_of_all_files:
-		collection.Add(CommonFileDialogFilter(description_of_all_files, "*.*"))
+	key = tuple((item.get("description", None) or "", tuple(item.get("extensions", None) or ())) for item in filters) if filters else ()
+	for filter in build_filters(key, None if exclude_filter_of_all_files else description_of_all_files):
+		collection.Add(filter)
 
 class OpenFilePickerOptions(TypedDict, total = False):
 	title: Optional[str]
@@ -52,12 +56,15 @@ class OpenFilePickerOptions(TypedDict, total = False):
 	filters: Optional[Iterable[FilterItem]]
 	exclude_filter_of_all_files: bool
 	default_file_name: Optional[str]
+	share_with_page: bool
 
 class OpenFileResult:
-	def __init__(self, multiple: bool, file_names: List[str]):
+	def __init__(self, multiple: bool, file_names: List[str], urls: Optional[List[str]] = None):
 		self.multiple = multiple
 		self.files = file_names
 		self.file = None if multiple else file_names[0]
+		self.urls = urls
+		self.url = None if multiple or not urls else urls[0]
 
 class OpenFilePicker(DialogBase[CommonOpenFileDialog]):
 	def __init__(self):
@@ -148,4 +155,10 @@ class DirectoryPicker(DialogBase[CommonOpenFileDialog]):
 		if self._selected:
 			dialog = self._dialog
 			return DirectoryResult(dialog.Multiselect, list(dialog.FileNames))
-		return None
\ No newline at end of file
+		return None
+
+def run_picker(picker_class: Type[OpenFilePicker | SaveFilePicker | DirectoryPicker], options: Any, owner: Window):
+	picker = picker_class()
+	picker.set_options(options)
+	picker.show_dialog(owner)
+	return picker.parse_result()
\ No newline at end of file
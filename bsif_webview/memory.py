@@ -0,0 +1,141 @@
+from enum import Enum
+from threading import Lock
+from time import monotonic
+from traceback import print_exception
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from System import Action # type: ignore
+from System.Diagnostics import Process # type: ignore
+from System.Threading.Tasks import Task as CSTask, TaskScheduler, TaskStatus # type: ignore
+from Microsoft.Web.WebView2.Core import CoreWebView2, CoreWebView2MemoryUsageTargetLevel # type: ignore
+
+class WebViewMemoryAction(Enum):
+	LOW_MEMORY = "low_memory"
+	SUSPEND = "suspend"
+
+type SuspendCallback = Callable[[bool], Any]
+
+def suspend_core(core: CoreWebView2, done: SuspendCallback):
+	def on_completed(task: CSTask):
+		if task.IsFaulted: print_exception(task.Exception)
+		done(task.Status == TaskStatus.RanToCompletion and bool(task.Result))
+	core.TrySuspendAsync().ContinueWith(Action[CSTask[bool]](on_completed), TaskScheduler.FromCurrentSynchronizationContext())
+
+class _TrackedCore:
+	def __init__(self, core: CoreWebView2, active: bool, now: float, set_visible: Optional[Callable[[bool], Any]]):
+		self.core = core
+		self.set_visible = set_visible
+		self.hidden = False
+		self.inactive_since = None if active else now
+		self.state = "active" if active else "inactive"
+
+class WebViewMemoryPolicy:
+	def __init__(
+		self,
+		idle_time: float = 60,
+		action = WebViewMemoryAction.LOW_MEMORY,
+		check_interval: Optional[float] = None,
+		clock: Callable[[], float] = monotonic,
+		suspend: Callable[[CoreWebView2, SuspendCallback], Any] = suspend_core,
+		levels: Tuple[Any, Any] = (CoreWebView2MemoryUsageTargetLevel.Normal, CoreWebView2MemoryUsageTargetLevel.Low)
+	):
+		if idle_time < 0: raise ValueError("Argument 'idle_time' must be non-negative.")
+		if not isinstance(action, WebViewMemoryAction): raise TypeError("Argument 'action' must be a WebViewMemoryAction.")
+		self.idle_time = idle_time
+		self.action = action
+		self.check_interval = check_interval if check_interval is not None else max(1, min(idle_time / 4, 15))
+		self.__clock = clock
+		self.__suspend_core = suspend
+		[self.__normal_level, self.__low_level] = levels
+		self.__lock = Lock()
+		self.__cores: Dict[Hashable, _TrackedCore] = {}
+
+	def track(self, key: Hashable, core: CoreWebView2, active: bool = True, set_visible: Optional[Callable[[bool], Any]] = None):
+		with self.__lock: self.__cores[key] = _TrackedCore(core, active, self.__clock(), set_visible)
+	def untrack(self, key: Hashable):
+		with self.__lock: self.__cores.pop(key, None)
+
+	def set_active(self, key: Hashable, active: bool):
+		with self.__lock:
+			entry = self.__cores.get(key)
+			if entry is None: return
+			if not active:
+				if entry.inactive_since is None:
+					entry.inactive_since = self.__clock()
+					entry.state = "inactive"
+				return
+			entry.inactive_since = None
+			state = entry.state
+			entry.state = "active"
+		if state == "active" or state == "inactive": return
+		core = entry.core
+		try:
+			if core.IsSuspended: core.Resume()
+			core.MemoryUsageTargetLevel = self.__normal_level
+		except Exception as e: print_exception(e)
+		self.__show(entry)
+
+	def __show(self, entry: _TrackedCore):
+		if not entry.hidden: return
+		entry.hidden = False
+		try: entry.set_visible(True) # type: ignore
+		except Exception as e: print_exception(e)
+	def __suspend(self, entry: _TrackedCore):
+		if entry.set_visible:
+			entry.set_visible(False)
+			entry.hidden = True
+		with self.__lock: entry.state = "suspending"
+		try: self.__suspend_core(entry.core, lambda suspended: self.__on_suspended(entry, suspended))
+		except Exception as e:
+			with self.__lock:
+				if entry.state == "suspending": entry.state = "reduced"
+			raise e
+	def __on_suspended(self, entry: _TrackedCore, suspended: bool):
+		with self.__lock:
+			state = entry.state
+			if state == "suspending": entry.state = "suspended" if suspended else "reduced"
+		if state == "suspending" or not suspended: return
+		try: entry.core.Resume()
+		except Exception as e: print_exception(e)
+
+	def tick(self):
+		deadline = self.__clock() - self.idle_time
+		with self.__lock:
+			due = [entry for entry in self.__cores.values() if entry.state == "inactive" and entry.inactive_since is not None and entry.inactive_since <= deadline]
+			for entry in due: entry.state = "reduced"
+		suspend = self.action == WebViewMemoryAction.SUSPEND
+		for entry in due:
+			core = entry.core
+			try:
+				core.MemoryUsageTargetLevel = self.__low_level
+				if suspend: self.__suspend(entry)
+			except Exception as e: print_exception(e)
+		return len(due)
+
+	def report(self) -> Dict[Hashable, Dict[str, Any]]:
+		now = self.__clock()
+		with self.__lock: entries = tuple(self.__cores.items())
+		result = {}
+		for key, entry in entries:
+			core = entry.core
+			inactive_since = entry.inactive_since
+			try: suspended, level = bool(core.IsSuspended), str(core.MemoryUsageTargetLevel)
+			except Exception: suspended, level = None, None
+			result[key] = {
+				"state": entry.state,
+				"inactive_for": None if inactive_since is None else now - inactive_since,
+				"suspended": suspended,
+				"memory_usage_target_level": level
+			}
+		return result
+	def process_report(self):
+		with self.__lock: entry = next(iter(self.__cores.values()), None)
+		return collect_process_memory(entry.core) if entry else []
+
+def collect_process_memory(core: CoreWebView2):
+	processes = []
+	for info in core.Environment.GetProcessInfos():
+		try: working_set = Process.GetProcessById(info.ProcessId).WorkingSet64
+		except Exception: working_set = None
+		processes.append({"id": info.ProcessId, "kind": str(info.Kind), "working_set": working_set})
+	return processes
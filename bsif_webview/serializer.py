@@ -0,0 +1,81 @@
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime, time
+from enum import Enum
+from json import JSONEncoder
+from operator import attrgetter
+from threading import Lock
+from typing import Any, Callable, Dict, Tuple, Type
+
+_adapters: Dict[type, Callable[[Any], Any]] = {}
+_encoders: Dict[type, Callable[[Any], Any]] = {}
+_lock = Lock()
+_unset = object()
+
+def register_serializer[T](cls: Type[T], adapter: Callable[[T], Any]):
+	if not isinstance(cls, type): raise TypeError("Argument 'cls' must be a class.")
+	if not callable(adapter): raise TypeError("Argument 'adapter' must be callable.")
+	with _lock:
+		_adapters[cls] = adapter
+		_encoders.clear()
+
+def unregister_serializer(cls: type):
+	with _lock:
+		if _adapters.pop(cls, None) is not None: _encoders.clear()
+
+def _collect_slots(cls: type) -> Tuple[str, ...]:
+	names = []
+	for item in reversed(cls.__mro__):
+		slots = item.__dict__.get("__slots__", ())
+		if isinstance(slots, str): slots = (slots,)
+		for name in slots:
+			if name in ("__dict__", "__weakref__") or name in names: continue
+			names.append(name)
+	return tuple(names)
+
+def _collect_set(object: object, names: Tuple[str, ...]):
+	result = {}
+	for name in names:
+		value = getattr(object, name, _unset)
+		if value is not _unset: result[name] = value
+	return result
+
+def _attribute_encoder(names: Tuple[str, ...], with_dict: bool):
+	if not names: return vars
+	getter = attrgetter(*names)
+	single = len(names) == 1
+	def encode_attributes(object: object):
+		try:
+			values = getter(object)
+			result = {names[0]: values} if single else dict(zip(names, values))
+		except AttributeError: result = _collect_set(object, names)
+		if with_dict: result.update(object.__dict__)
+		return result
+	return encode_attributes
+
+def _build_encoder(cls: type) -> Callable[[Any], Any]:
+	for item in cls.__mro__:
+		adapter = _adapters.get(item)
+		if adapter: return adapter
+	if issubclass(cls, Enum): return attrgetter("value")
+	if issubclass(cls, (datetime, date, time)): return cls.isoformat
+	if issubclass(cls, (set, frozenset)): return list
+	if issubclass(cls, (bytes, bytearray, memoryview)): return list
+	if is_dataclass(cls):
+		names = tuple(field.name for field in fields(cls))
+		return _attribute_encoder(names, False)
+	slots = _collect_slots(cls)
+	if slots: return _attribute_encoder(slots, cls.__dictoffset__ != 0)
+	if cls.__dictoffset__: return vars
+	def unsupported(_): raise TypeError(f"Object of type {cls.__name__} is not JSON serializable")
+	return unsupported
+
+def serialize_object(object: object):
+	cls = object.__class__
+	encoder = _encoders.get(cls)
+	if encoder is None:
+		with _lock:
+			encoder = _encoders.get(cls)
+			if encoder is None: encoder = _encoders[cls] = _build_encoder(cls)
+	return encoder(object)
+
+encode = JSONEncoder(ensure_ascii=False, default=serialize_object).encode
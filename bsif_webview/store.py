@@ -0,0 +1,279 @@
+from enum import Enum
+from json import loads
+from mmap import ACCESS_READ, mmap
+from os import fstat, fsync, makedirs, remove, replace
+from os.path import exists, join
+from struct import Struct
+from threading import Condition, Event, Lock, Thread
+from time import monotonic
+from traceback import print_exception
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .serializer import encode
+
+RECORD_HEADER = Struct("<BII")
+OPERATION_SET = 1
+OPERATION_DELETE = 2
+MMAP_THRESHOLD = 1 << 16
+RETRY_DELAY = 1
+STORE_FILE_NAME = "store.log"
+
+type FlushCallback = Callable[[Optional[BaseException]], Any]
+
+class StoreDurability(Enum):
+	LAZY = "lazy"
+	BATCHED = "batched"
+	IMMEDIATE = "immediate"
+
+class KeyValueStore:
+	def __init__(self, directory: str, durability = StoreDurability.BATCHED, flush_interval: float = 0.5):
+		if not isinstance(durability, StoreDurability): raise TypeError("Argument 'durability' must be a StoreDurability.")
+		makedirs(directory, exist_ok=True)
+		self.durability = durability
+		self.flush_interval = flush_interval
+		self.__path = join(directory, STORE_FILE_NAME)
+		self.__index: Dict[str, Tuple[int, int]] = {}
+		self.__pending: Dict[str, Optional[bytes]] = {}
+		self.__flushing: Dict[str, Optional[bytes]] = {}
+		self.__callbacks: List[FlushCallback] = []
+		self.__urgent = False
+		self.__condition = Condition()
+		self.__read_lock = Lock()
+		self.__closed = False
+		size = self.__load()
+		self.__writer = open(self.__path, "ab")
+		self.__reader = open(self.__path, "rb")
+		self.__size = size
+		self.__map: Optional[mmap] = None
+		self.__thread = Thread(target=self.__run, name="WebViewStoreFlusher", daemon=True)
+		self.__thread.start()
+
+	def __load(self):
+		if not exists(self.__path): return 0
+		index = self.__index
+		header_size = RECORD_HEADER.size
+		with open(self.__path, "r+b") as file:
+			length = fstat(file.fileno()).st_size
+			offset = 0
+			while offset + header_size <= length:
+				[operation, key_length, value_length] = RECORD_HEADER.unpack(file.read(header_size))
+				end = offset + header_size + key_length + value_length
+				if end > length or operation not in (OPERATION_SET, OPERATION_DELETE): break
+				key = file.read(key_length).decode("utf-8")
+				if operation == OPERATION_SET: index[key] = (offset + header_size + key_length, value_length)
+				else: index.pop(key, None)
+				file.seek(end)
+				offset = end
+			if offset != length: file.truncate(offset)
+		return offset
+
+	def __read(self, offset: int, length: int):
+		with self.__read_lock:
+			if length < MMAP_THRESHOLD:
+				reader = self.__reader
+				reader.seek(offset)
+				return reader.read(length)
+			mapped = self.__map
+			if mapped is None or len(mapped) < offset + length:
+				if mapped is not None: mapped.close()
+				mapped = self.__map = mmap(self.__reader.fileno(), 0, access=ACCESS_READ)
+			return mapped[offset:offset + length]
+
+	def __find(self, key: str) -> Tuple[bool, Optional[bytes], Optional[Tuple[int, int]]]:
+		if self.__closed: raise Exception("Store is closed.")
+		if key in self.__pending: return True, self.__pending[key], None
+		if key in self.__flushing: return True, self.__flushing[key], None
+		return False, None, self.__index.get(key)
+
+	def get(self, key: str, default: Any = None):
+		with self.__condition: [buffered, value, location] = self.__find(key)
+		if not buffered and location is not None: value = self.__read(*location)
+		return default if value is None else loads(value)
+	def contains(self, key: str):
+		with self.__condition:
+			[buffered, value, location] = self.__find(key)
+			return value is not None if buffered else location is not None
+	def keys(self):
+		with self.__condition:
+			keys = set(self.__index)
+			for changes in (self.__flushing, self.__pending):
+				for key, value in changes.items():
+					if value is None: keys.discard(key)
+					else: keys.add(key)
+		return sorted(keys)
+
+	def __wait(self, callback: FlushCallback):
+		event = Event()
+		failure: List[BaseException] = []
+		def complete(error: Optional[BaseException]):
+			if error is not None: failure.append(error)
+			event.set()
+		callback(complete)
+		event.wait()
+		if failure: raise failure[0]
+	def __write(self, key: str, value: Optional[bytes], on_flushed: Optional[FlushCallback]):
+		if type(key) is not str: raise TypeError("Key must be a string.")
+		if on_flushed is None and self.durability == StoreDurability.IMMEDIATE:
+			self.__wait(lambda complete: self.__write(key, value, complete))
+			return
+		with self.__condition:
+			[buffered, previous, location] = self.__find(key)
+			existed = previous is not None if buffered else location is not None
+			self.__pending[key] = value
+			if on_flushed: self.__callbacks.append(on_flushed)
+			if self.durability == StoreDurability.IMMEDIATE: self.__urgent = True
+			self.__condition.notify()
+		return existed
+	def set(self, key: str, value: Any, on_flushed: Optional[FlushCallback] = None):
+		self.__write(key, encode(value).encode("utf-8"), on_flushed)
+	def delete(self, key: str, on_flushed: Optional[FlushCallback] = None):
+		if on_flushed is None and self.durability == StoreDurability.IMMEDIATE:
+			existed = self.contains(key)
+			self.__write(key, None, None)
+			return existed
+		return self.__write(key, None, on_flushed)
+	def flush(self):
+		def request(complete: FlushCallback):
+			with self.__condition:
+				if self.__closed:
+					complete(None)
+					return
+				self.__callbacks.append(complete)
+				self.__urgent = True
+				self.__condition.notify()
+		self.__wait(request)
+
+	def __run(self):
+		condition = self.__condition
+		while True:
+			with condition:
+				condition.wait_for(lambda: self.__pending or self.__callbacks or self.__closed)
+				deadline = monotonic() + self.flush_interval
+				while not self.__closed and not self.__urgent:
+					remaining = deadline - monotonic()
+					if remaining <= 0: break
+					condition.wait(remaining)
+				self.__urgent = False
+				batch = self.__flushing = self.__pending
+				callbacks = self.__callbacks
+				self.__pending = {}
+				self.__callbacks = []
+				closed = self.__closed
+			error: Optional[BaseException] = None
+			try: locations = self.__append(batch)
+			except Exception as e:
+				print_exception(e)
+				error = e
+			with condition:
+				if error is None:
+					index = self.__index
+					for key, location in locations.items():
+						if location is None: index.pop(key, None)
+						else: index[key] = location
+				else:
+					for key, value in batch.items(): self.__pending.setdefault(key, value)
+				self.__flushing = {}
+			for callback in callbacks:
+				try: callback(error)
+				except Exception as e: print_exception(e)
+			if closed: return
+			if error is not None:
+				with condition: condition.wait_for(lambda: self.__closed, RETRY_DELAY)
+
+	def __append(self, batch: Dict[str, Optional[bytes]]):
+		locations: Dict[str, Optional[Tuple[int, int]]] = {}
+		if not batch: return locations
+		buffer = bytearray()
+		base = self.__size
+		for key, value in batch.items():
+			key_bytes = key.encode("utf-8")
+			if value is None:
+				buffer += RECORD_HEADER.pack(OPERATION_DELETE, len(key_bytes), 0)
+				buffer += key_bytes
+				locations[key] = None
+				continue
+			buffer += RECORD_HEADER.pack(OPERATION_SET, len(key_bytes), len(value))
+			buffer += key_bytes
+			locations[key] = (base + len(buffer), len(value))
+			buffer += value
+		writer = self.__writer
+		try:
+			writer.write(buffer)
+			writer.flush()
+			if self.durability != StoreDurability.LAZY: fsync(writer.fileno())
+		except BaseException as e:
+			self.__rollback()
+			raise e
+		self.__size = base + len(buffer)
+		return locations
+	def __rollback(self):
+		try: self.__writer.close()
+		except Exception: pass
+		try:
+			with self.__read_lock:
+				if self.__map is not None: self.__map.close()
+				self.__map = None
+				with open(self.__path, "r+b") as file: file.truncate(self.__size)
+		finally: self.__writer = open(self.__path, "ab")
+
+	def __compact(self):
+		temporary_path = self.__path + ".compact"
+		header_size = RECORD_HEADER.size
+		offset = 0
+		index: Dict[str, Tuple[int, int]] = {}
+		with open(temporary_path, "wb") as file:
+			for key, location in self.__index.items():
+				value = self.__read(*location)
+				key_bytes = key.encode("utf-8")
+				file.write(RECORD_HEADER.pack(OPERATION_SET, len(key_bytes), len(value)))
+				file.write(key_bytes)
+				file.write(value)
+				index[key] = (offset + header_size + len(key_bytes), len(value))
+				offset += header_size + len(key_bytes) + len(value)
+			file.flush()
+			fsync(file.fileno())
+		return temporary_path, index
+
+	def close(self, compact: bool = True):
+		with self.__condition:
+			if self.__closed: return
+			self.__closed = True
+			self.__condition.notify()
+		self.__thread.join()
+		compacted = None
+		if compact:
+			try: compacted = self.__compact()
+			except Exception as e: print_exception(e)
+		with self.__read_lock:
+			if self.__map is not None: self.__map.close()
+			self.__map = None
+			self.__reader.close()
+		self.__writer.close()
+		if compacted:
+			[temporary_path, index] = compacted
+			try:
+				replace(temporary_path, self.__path)
+				self.__index = index
+			except OSError as e:
+				print_exception(e)
+				remove(temporary_path)
+
+def store_natives(get_store: Callable[[], KeyValueStore]) -> Dict[str, Callable[[List[Any], Callable[[bool, Any], None]], None]]:
+	def store_get(args: List[Any], complete: Callable[[bool, Any], None]):
+		complete(True, get_store().get(*args[:2]))
+	def store_keys(args: List[Any], complete: Callable[[bool, Any], None]):
+		complete(True, get_store().keys())
+	def store_set(args: List[Any], complete: Callable[[bool, Any], None]):
+		store = get_store()
+		[key, value] = args
+		if store.durability == StoreDurability.IMMEDIATE: store.set(key, value, lambda error: complete(error is None, error))
+		else:
+			store.set(key, value)
+			complete(True, None)
+	def store_delete(args: List[Any], complete: Callable[[bool, Any], None]):
+		store = get_store()
+		if store.durability == StoreDurability.IMMEDIATE:
+			existed = store.contains(args[0])
+			store.delete(args[0], lambda error: complete(error is None, existed if error is None else error))
+		else: complete(True, store.delete(args[0]))
+	return {"storeGet": store_get, "storeKeys": store_keys, "storeSet": store_set, "storeDelete": store_delete}
@@ -0,0 +1,108 @@
+from collections import deque
+from math import ceil
+from threading import Lock
+from time import perf_counter
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+TIMELINE_METRICS = ("dom_content_loaded", "navigation_completed", "bridge_ready", "first_api_call")
+PAGE_TIMING_METRICS = ("responseStart", "responseEnd", "domInteractive", "domContentLoadedEventEnd", "loadEventEnd", "duration")
+
+_cold_lock = Lock()
+_cold_available = True
+
+def _is_placeholder(uri: str): return uri.startswith("about:")
+
+def _claim_cold(uri: str):
+	global _cold_available
+	if _is_placeholder(uri): return False
+	with _cold_lock:
+		cold = _cold_available
+		_cold_available = False
+	return cold
+
+class NavigationRecord:
+	def __init__(self, navigation_id: int, uri: str, cold: bool):
+		self.navigation_id = navigation_id
+		self.uri = uri
+		self.cold = cold
+		self.sampled = not _is_placeholder(uri)
+		self.started = perf_counter()
+		self.success: Optional[bool] = None
+		self.status: Optional[int] = None
+		self.marks: Dict[str, float] = {}
+		self.navigation_timing: Optional[Dict[str, Any]] = None
+
+class WebViewTimeline:
+	def __init__(self, history_size: int = 64, sample_size: int = 1024):
+		self.__lock = Lock()
+		self.__records: Deque[NavigationRecord] = deque(maxlen=history_size)
+		self.__current: Optional[NavigationRecord] = None
+		self.__sample_size = sample_size
+		self.__samples: Dict[Tuple[str, bool], Deque[float]] = {}
+
+	def __find(self, navigation_id: int):
+		for record in reversed(self.__records):
+			if record.navigation_id == navigation_id: return record
+		return None
+	def __add_sample(self, record: NavigationRecord, metric: str, value: float):
+		if not record.sampled: return
+		key = (metric, record.cold)
+		samples = self.__samples.get(key)
+		if samples is None: samples = self.__samples[key] = deque(maxlen=self.__sample_size)
+		samples.append(value)
+	def __mark(self, record: Optional[NavigationRecord], metric: str):
+		if record is None or metric in record.marks: return
+		value = record.marks[metric] = (perf_counter() - record.started) * 1000
+		self.__add_sample(record, metric, value)
+
+	def navigation_started(self, navigation_id: int, uri: str):
+		with self.__lock:
+			record = self.__current = NavigationRecord(navigation_id, uri, _claim_cold(uri))
+			self.__records.append(record)
+	def navigation_completed(self, navigation_id: int, success: bool, status: int):
+		with self.__lock:
+			record = self.__find(navigation_id)
+			if record is None: return
+			record.success = success
+			record.status = status
+			self.__mark(record, "navigation_completed")
+	def dom_content_loaded(self, navigation_id: int):
+		with self.__lock: self.__mark(self.__find(navigation_id), "dom_content_loaded")
+	def bridge_ready(self):
+		with self.__lock: self.__mark(self.__current, "bridge_ready")
+	def api_called(self):
+		record = self.__current
+		if record is None or "first_api_call" in record.marks: return
+		with self.__lock: self.__mark(record, "first_api_call")
+	def navigation_timing(self, entry: Dict[str, Any]):
+		with self.__lock:
+			record = self.__current
+			if record is None or record.navigation_timing is not None: return
+			record.navigation_timing = entry
+			for metric in PAGE_TIMING_METRICS:
+				value = entry.get(metric)
+				if isinstance(value, (int, float)) and value > 0: self.__add_sample(record, "page." + metric, value)
+
+	@property
+	def current(self):
+		with self.__lock: return self.__current
+	@property
+	def records(self) -> List[NavigationRecord]:
+		with self.__lock: return list(self.__records)
+	@property
+	def metrics(self):
+		with self.__lock: return sorted({metric for metric, _ in self.__samples})
+
+	def percentiles(self, metric: str, percents: Iterable[float] = (50, 90, 99), cold: Optional[bool] = None) -> Dict[float, Optional[float]]:
+		with self.__lock:
+			samples = [value for (name, is_cold), values in self.__samples.items() if name == metric and (cold is None or cold == is_cold) for value in values]
+		samples.sort()
+		length = len(samples)
+		result: Dict[float, Optional[float]] = {}
+		for percent in percents:
+			if not 0 <= percent <= 100: raise ValueError("Percent must be between 0 and 100.")
+			result[percent] = samples[max(0, ceil(percent / 100 * length) - 1)] if length else None
+		return result
+	def summary(self, percents: Iterable[float] = (50, 90, 99), cold: Optional[bool] = None):
+		percents = tuple(percents)
+		return {metric: self.percentiles(metric, percents, cold) for metric in self.metrics}
@@ -3,17 +3,22 @@ from .helper import ARCHITECTURE, LIBRARIES, PLATFORM_MAP
 if ARCHITECTURE not in PLATFORM_MAP:
 	raise RuntimeError("Unsupported platform.")
 
-from asyncio import get_running_loop
+from asyncio import Future, get_running_loop, wait_for
 from enum import Enum
+from gc import collect, get_referrers
 from inspect import isfunction, ismethod
-from json import dumps, loads
+from json import loads
 from traceback import print_exception
+from types import FrameType
 from clr import AddReference
 from os import getenv
 from os.path import join
-from threading import Lock, Thread, current_thread, main_thread
-from typing import Any, Callable, Iterable, Literal, Optional, Self, Tuple, TypedDict, Unpack
-from weakref import WeakKeyDictionary
+from re import sub
+from threading import Lock, Thread, Timer, current_thread, main_thread
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Literal, Optional, Self, Set, Tuple, Type, TypedDict, Unpack
+from warnings import warn
+from weakref import WeakKeyDictionary, WeakSet, ref
 from bsif_utils.notifier import Notifier
 
 AddReference("wpf\\PresentationFramework")
@@ -22,21 +27,25 @@ AddReference(join(webview2_dlls, "Microsoft.Web.WebView2.Core.dll"))
 AddReference(join(webview2_dlls, "Microsoft.Web.WebView2.Wpf.dll"))
 del webview2_dlls
 
-from System import Action, EventArgs, Exception as CSException, Uri, Func, Object as CSObject
+from System import Action, EventArgs, Exception as CSException, Uri, Func, Object as CSObject, TimeSpan
 from System.Drawing import Color # type: ignore
 from System.Threading import ApartmentState, Thread as CSharpThread, ParameterizedThreadStart
 from System.Threading.Tasks import Task as CSTask # type: ignore
-from System.Windows import Application, ResizeMode, ShutdownMode, Window, WindowState, WindowStyle
+from System.Windows import Application, ResizeMode, ShutdownMode, Visibility, Window, WindowState, WindowStyle
 from System.Windows.Controls import Grid # type: ignore
 from System.Windows.Media import Brushes, ImageSource
 from System.Windows.Media.Imaging import BitmapImage # type: ignore
-from System.Windows.Threading import Dispatcher # type: ignore
+from System.Windows.Threading import Dispatcher, DispatcherPriority, DispatcherTimer # type: ignore
 
 from Microsoft.Web.WebView2.Core import( # type: ignore
 	CoreWebView2HostResourceAccessKind,
+	CoreWebView2ContentLoadingEventArgs,
+	CoreWebView2DOMContentLoadedEventArgs,
 	CoreWebView2NavigationCompletedEventArgs,
 	CoreWebView2NavigationStartingEventArgs,
 	CoreWebView2NewWindowRequestedEventArgs,
+	CoreWebView2WebResourceContext,
+	CoreWebView2WebResourceRequestedEventArgs,
 	CoreWebView2InitializationCompletedEventArgs,
 	CoreWebView2PermissionRequestedEventArgs,
 	CoreWebView2PermissionState,
@@ -44,8 +53,22 @@ from Microsoft.Web.WebView2.Core import( # type: ignore
 )
 from Microsoft.Web.WebView2.Wpf import CoreWebView2CreationProperties, WebView2 # type: ignore
 
-from .bridge import Bridge, serialize_object
-from .file_system_dialog import DirectoryPicker, DirectoryPickerOptions, OpenFilePicker, OpenFilePickerOptions, SaveFilePicker, SaveFilePickerOptions
+from .bridge import (
+	Bridge, BridgeScheduler, ScriptCallRegistry,
+	ENVELOPE_KEY, MESSAGE_BRIDGE_READY, MESSAGE_CALL, MESSAGE_CALL_RESULT, MESSAGE_NAVIGATION_TIMING,
+	MESSAGE_PUBLISH, MESSAGE_SUBSCRIBE, MESSAGE_UNSUBSCRIBE, envelope
+)
+from .capture import AsyncFrameSink, CaptureFormat, FileFrameSink, FrameCapture, FrameSink
+from .file_resource import FILE_RESOURCE_FILTER, FileResourceRegistry, is_file_resource, respond_file_request
+from .memory import WebViewMemoryPolicy
+from .serializer import encode
+from .store import KeyValueStore, StoreDurability, store_natives
+from .timeline import WebViewTimeline
+from .file_system_dialog import (
+	DirectoryPicker, DirectoryPickerOptions, DirectoryResult,
+	OpenFilePicker, OpenFilePickerOptions, OpenFileResult,
+	SaveFilePicker, SaveFilePickerOptions, SaveFileResult, run_picker
+)
 
 class WebViewException(Exception):
 	def __init__(self, exception: CSException):
@@ -65,9 +88,19 @@ class WebViewApplicationParameters(TypedDict, total=False):
 	debug_enabled: bool
 	user_agent: str
 	virtual_hosts: Iterable[WebViewVirtualHost]
-	api: object
+	api: object # "async def" handlers share one event loop per lane and must not block, use "await" or "asyncio.to_thread" for blocking work
 	web_api_permission_bypass: bool
+	file_picker_api: bool
+	store_api: bool
 	stop_at_main_window_closed: bool
+	bridge_workers: int
+	bridge_background_workers: int
+	bridge_max_in_flight: int
+	bridge_window_max_in_flight: int
+	memory_policy: WebViewMemoryPolicy
+	store_durability: StoreDurability
+	store_flush_interval: float
+	leak_warning_timeout: float
 
 class WebViewGlobalConfiguration:
 	def __init__(self, data: WebViewApplicationParameters):
@@ -79,6 +112,16 @@ class WebViewGlobalConfiguration:
 		self.virtual_hosts = data.get("virtual_hosts")
 		self.api = data.get("api")
 		self.web_api_permission_bypass = data.get("web_api_permission_bypass", False)
+		self.file_picker_api = data.get("file_picker_api", False)
+		self.store_api = data.get("store_api", False)
+		self.bridge_workers = data.get("bridge_workers", 16)
+		self.bridge_background_workers = data.get("bridge_background_workers")
+		self.bridge_max_in_flight = data.get("bridge_max_in_flight", 256)
+		self.bridge_window_max_in_flight = data.get("bridge_window_max_in_flight", 64)
+		self.memory_policy = data.get("memory_policy")
+		self.store_durability = data.get("store_durability", StoreDurability.BATCHED)
+		self.store_flush_interval = data.get("store_flush_interval", 0.5)
+		self.leak_warning_timeout = data.get("leak_warning_timeout", 30 if self.debug_enabled else None)
 
 class WebViewWindowParameters(TypedDict, total=False):
 	initial_uri: str
@@ -95,6 +138,9 @@ class WebViewWindowParameters(TypedDict, total=False):
 	virtual_hosts: Iterable[WebViewVirtualHost]
 	api: object
 	web_api_permission_bypass: bool
+	file_picker_api: bool
+	store_api: bool
+	bridge_window_max_in_flight: int
 
 _state_lock = Lock()
 
@@ -110,8 +156,102 @@ def _cross_thread_call[*AT, RT](dispatcher: Optional[Dispatcher], method: Callab
 	if result[0] == True: return result[1]
 	else: raise result[1]
 
+def _cross_thread_post_executor(method: Callable, args: Tuple):
+	try: method(*args)
+	except Exception as e: print_exception(e)
+_cross_thread_post_delegate = Action[CSObject, CSObject](_cross_thread_post_executor) # type: ignore
+def _cross_thread_post[*AT](dispatcher: Optional[Dispatcher], method: Callable[[*AT], Any], args: Tuple[*AT] = (), priority: DispatcherPriority = DispatcherPriority.Normal):
+	if not dispatcher: raise Exception("UI object is disposed.")
+	dispatcher.BeginInvoke(_cross_thread_post_delegate, priority, (method, args))
+
+class WebViewDispatchPriority(Enum):
+	SEND = DispatcherPriority.Send
+	NORMAL = DispatcherPriority.Normal
+	RENDER = DispatcherPriority.Render
+	INPUT = DispatcherPriority.Input
+	BACKGROUND = DispatcherPriority.Background
+	IDLE = DispatcherPriority.ApplicationIdle
+
+class _CoalescingScheduler:
+	def __init__(self):
+		self.__pending: Dict[str, Tuple[Callable, Tuple]] = {}
+		self.__lock = Lock()
+	def schedule(self, dispatcher: Optional[Dispatcher], key: str, method: Callable, args: Tuple, priority: DispatcherPriority):
+		with self.__lock:
+			scheduled = key in self.__pending
+			self.__pending[key] = (method, args)
+		if scheduled: return
+		try: _cross_thread_post(dispatcher, self.__flush, (key,), priority)
+		except Exception as e:
+			with self.__lock: self.__pending.pop(key, None)
+			raise e
+	def __flush(self, key: str):
+		with self.__lock: [method, args] = self.__pending.pop(key)
+		method(*args)
+
+def _set_width(window: Window, value: float): window.Width = value
+def _set_height(window: Window, value: float): window.Height = value
+def _set_top(window: Window, value: float): window.Top = value
+def _set_left(window: Window, value: float): window.Left = value
+def _set_min_width(window: Window, value: float): window.MinWidth = value
+def _set_min_height(window: Window, value: float): window.MinHeight = value
+def _set_max_width(window: Window, value: float): window.MaxWidth = value
+def _set_max_height(window: Window, value: float): window.MaxHeight = value
+_schedulable_setters: Dict[str, Callable[[Window, float], None]] = {
+	"width": _set_width,
+	"height": _set_height,
+	"top": _set_top,
+	"left": _set_left,
+	"min_width": _set_min_width,
+	"min_height": _set_min_height,
+	"max_width": _set_max_width,
+	"max_height": _set_max_height,
+}
+type WebViewSchedulableProperty = Literal["width", "height", "top", "left", "min_width", "min_height", "max_width", "max_height"]
+
+def _settle_future(future: Future, success: bool, value: Any):
+	if future.done(): return
+	if success: future.set_result(value)
+	else: future.set_exception(value)
+
+def _snake_case(name: str): return sub("[A-Z]", lambda match: "_" + match[0].lower(), name)
+
 _window_map: WeakKeyDictionary[Window, "WebViewWindow"] = WeakKeyDictionary()
 
+class _CountingNotifier[*AT](Notifier[*AT]):
+	def __init__(self):
+		super().__init__()
+		self.handler_count = 0
+	def add_handler(self, handler: Callable[[*AT], Any]):
+		super().add_handler(handler)
+		self.handler_count += 1
+	def remove_handler(self, handler: Callable):
+		super().remove_handler(handler)
+		self.handler_count -= 1
+	def remove_all_handlers(self):
+		super().remove_all_handlers()
+		self.handler_count = 0
+
+def _retained_report(window: "WebViewWindow", ignored: Tuple[Any, ...] = ()):
+	report = window.resource_report()
+	ignored_ids = {id(item) for item in ignored}
+	report["referrers"] = sorted(type(referrer).__name__ for referrer in get_referrers(window) if id(referrer) not in ignored_ids and not isinstance(referrer, FrameType))
+	return report
+
+def _check_collected(window_ref: "ref[WebViewWindow]", timeout: float):
+	if window_ref() is None: return
+	collect()
+	window = window_ref()
+	if window is None: return
+	report = _retained_report(window)
+	del window
+	warn(f"Closed WebViewWindow was not collected within {timeout:g}s: {report}", RuntimeWarning)
+
+def _fan_out(posts: Tuple[Callable[[str], None], ...], message: str):
+	for post in posts:
+		try: post(message)
+		except Exception as e: print_exception(e)
+
 class WebViewApplication:
 	@property
 	def stop_at_main_window_closed(self):
@@ -135,7 +275,8 @@ class WebViewApplication:
 			self.__main_window = value
 
 	def __init__(self, **params: Unpack[WebViewApplicationParameters]):
-		self.__configuration = WebViewGlobalConfiguration(params)
+		configuration = self.__configuration = WebViewGlobalConfiguration(params)
+		self.__bridge_scheduler = BridgeScheduler(configuration.bridge_workers, configuration.bridge_max_in_flight, configuration.bridge_background_workers)
 		self.__running = False
 		self.__application: Optional[Application] = None
 		self.__dispatcher: Optional[Dispatcher] = None
@@ -143,16 +284,85 @@ class WebViewApplication:
 		self.__main_window: Optional[WebViewWindow] = None
 		self.__stopping = False
 		self.__lock = Lock()
+		self.__topics: Dict[str, Dict[WebViewWindow, Callable[[str], None]]] = {}
+		self.__topics_lock = Lock()
+		self.__store: Optional[KeyValueStore] = None
+		self.__store_lock = Lock()
+		self.__windows: WeakSet[WebViewWindow] = WeakSet()
+		self.__windows_created = 0
 
 	def __on_window_closed(self, window: Window, _):
+		webview_window = _window_map[window]
+		timeout = self.__configuration.leak_warning_timeout
+		if timeout is not None:
+			timer = Timer(timeout, _check_collected, (ref(webview_window), timeout))
+			timer.daemon = True
+			timer.start()
 		with self.__lock:
-			if _window_map[window] == self.__main_window:
+			if webview_window == self.__main_window:
 				self.__main_window = None
 				if self.__stop_at_main_window_closed:
 					self.__stop()
+	def __on_subscription_changed(self, window: "WebViewWindow", topic: str, subscribed: bool, post: Callable[[str], None]):
+		with self.__topics_lock:
+			if subscribed:
+				self.__topics.setdefault(topic, {})[window] = post
+				return
+			subscribers = self.__topics.get(topic)
+			if subscribers is None: return
+			subscribers.pop(window, None)
+			if not subscribers: del self.__topics[topic]
+	def publish(self, topic: str, message: Any):
+		with self.__topics_lock:
+			subscribers = self.__topics.get(topic)
+			if not subscribers: return 0
+			posts = tuple(subscribers.values())
+		_cross_thread_post(self.__dispatcher, _fan_out, (posts, envelope(MESSAGE_PUBLISH, topic, message)))
+		return len(posts)
+	@property
+	def topics(self):
+		with self.__topics_lock: return {topic: len(subscribers) for topic, subscribers in self.__topics.items()}
+
 	def create_window(self, **params: Unpack[WebViewWindowParameters]):
 		assert self.__dispatcher
-		return _cross_thread_call(self.__dispatcher, WebViewWindow, (self.__dispatcher, self.__configuration, params, self.__on_window_closed))
+		window = _cross_thread_call(self.__dispatcher, WebViewWindow, (self.__dispatcher, self.__configuration, params, self.__on_window_closed, self.__bridge_scheduler, self.__on_subscription_changed, lambda: self.store))
+		self.__windows.add(window)
+		self.__windows_created += 1
+		return window
+
+	def inspect_windows(self, collect_garbage: bool = True):
+		if collect_garbage: collect()
+		windows = list(self.__windows)
+		live = []
+		closed = []
+		for window in windows:
+			if window.closed: closed.append(_retained_report(window, (windows,)))
+			else: live.append(window.resource_report())
+		return {"created": self.__windows_created, "collected": self.__windows_created - len(windows), "live": live, "closed": closed}
+
+	@property
+	def bridge_statistics(self): return self.__bridge_scheduler.statistics
+
+	@property
+	def store(self):
+		with self.__store_lock:
+			store = self.__store
+			if store is None:
+				configuration = self.__configuration
+				store = self.__store = KeyValueStore(join(configuration.data_folder, "bsif_store"), configuration.store_durability, configuration.store_flush_interval)
+			return store
+	def __close_store(self):
+		with self.__store_lock:
+			store = self.__store
+			self.__store = None
+		if store: store.close()
+
+	def __memory_report(self, policy: WebViewMemoryPolicy):
+		return {"windows": policy.report(), "processes": policy.process_report()}
+	def memory_report(self):
+		policy = self.__configuration.memory_policy
+		if policy is None: raise Exception("No memory policy is configured.")
+		return _cross_thread_call(self.__dispatcher, self.__memory_report, (policy,))
 
 	def __run(self, params: Tuple[Optional[Callable[[Self], Any]], WebViewWindowParameters]):
 		self.__running = True
@@ -161,6 +371,12 @@ class WebViewApplication:
 		self.__dispatcher = app.Dispatcher
 		[main, options] = params
 		app.ShutdownMode = ShutdownMode.OnExplicitShutdown
+		policy = self.__configuration.memory_policy
+		if policy:
+			timer = DispatcherTimer()
+			timer.Interval = TimeSpan.FromSeconds(policy.check_interval)
+			timer.Tick += lambda *_: policy.tick()
+			timer.Start()
 		if main:
 			self.__lock.release()
 			try: main(self)
@@ -191,6 +407,7 @@ class WebViewApplication:
 		thread.SetApartmentState(ApartmentState.STA)
 		thread.Start((main, params))
 		thread.Join()
+		self.__close_store()
 		with _state_lock, self_lock:
 			self.__running = self.__stopping = False
 			_running_application = self.__dispatcher = None
@@ -211,6 +428,9 @@ class WebViewWindowInitializeParameters:
 		self.user_agent = params.get("user_agent", global_configuration.user_agent)
 		self.virtual_hosts = params.get("virtual_hosts", global_configuration.virtual_hosts)
 		self.web_api_permission_bypass = params.get("web_api_permission_bypass", global_configuration.web_api_permission_bypass)
+		self.file_picker_api = params.get("file_picker_api", global_configuration.file_picker_api)
+		self.store_api = params.get("store_api", global_configuration.store_api)
+		self.bridge_window_max_in_flight = params.get("bridge_window_max_in_flight", global_configuration.bridge_window_max_in_flight)
 
 class WebViewWindowState(Enum):
 	NORMAL = WindowState.Normal
@@ -220,12 +440,26 @@ class WebViewWindowState(Enum):
 _execute_javascript_delegate = Action[CSTask[str]]
 
 class WebViewWindow:
-	def __init__(self, dispatcher: Dispatcher, configuration: WebViewGlobalConfiguration, params: WebViewWindowParameters, on_closed: Callable[[Window, EventArgs], None]):
+	def __init__(self, dispatcher: Dispatcher, configuration: WebViewGlobalConfiguration, params: WebViewWindowParameters, on_closed: Callable[[Window, EventArgs], None], bridge_scheduler: BridgeScheduler, on_subscription_changed: Callable[[Self, str, bool, Callable[[str], None]], None], get_store: Callable[[], KeyValueStore]):
 		self.__closed = False
+		self.__get_store = get_store
+		self.__closed_at: Optional[float] = None
+		self.__hooks: List[Tuple[Any, str, Callable]] = []
+		self.__on_subscription_changed = on_subscription_changed
+		self.__topics: Set[str] = set()
+		self.__bridge_scheduler = bridge_scheduler
+		self.__bridge: Optional[Bridge] = None
+		self.__script_calls = ScriptCallRegistry()
 		self.__dispatcher = dispatcher
-		self.__message_notifier = Notifier[Any]()
-		self.__on_closed = Notifier[Self]()
+		self.__message_notifier = _CountingNotifier[Any]()
+		self.__on_closed = _CountingNotifier[Self]()
 		self.__fullscreen: Optional[Tuple[WindowStyle, WindowState]] = None
+		self.__timeline = WebViewTimeline()
+		self.__memory_policy = configuration.memory_policy
+		self.__file_resources = FileResourceRegistry()
+		self.__captures: Set[FrameCapture] = set()
+		self.__scheduler = _CoalescingScheduler()
+		self.__debug_enabled = configuration.debug_enabled
 
 		window = self.__window = Window()
 		_window_map[window] = self
@@ -273,11 +507,11 @@ class WebViewWindow:
 		webview.DefaultBackgroundColor = Color.Transparent
 		self.__api = params.get("api", configuration.api)
 
-		webview.CoreWebView2InitializationCompleted += lambda w, a: self.__on_webview_ready(init_params, w, a)
-		if configuration.debug_enabled:
-			webview.NavigationStarting += self.__on_navigation_start
-			webview.NavigationCompleted += self.__on_navigation_completed
-		webview.WebMessageReceived += self.__on_javascript_message
+		self.__init_params = init_params
+		self.__hook(webview, "CoreWebView2InitializationCompleted", self.__on_webview_ready)
+		self.__hook(webview, "NavigationStarting", self.__on_navigation_start)
+		self.__hook(webview, "NavigationCompleted", self.__on_navigation_completed)
+		self.__hook(webview, "WebMessageReceived", self.__on_javascript_message)
 		initial_uri = self.__navigate_uri = params.get("initial_uri", "about:blank")
 		webview.Source = Uri(initial_uri)
 
@@ -285,10 +519,24 @@ class WebViewWindow:
 		layout.Children.Add(webview)
 		window.Content = layout
 
-		closed_event = window.Closed
-		closed_event += on_closed
-		closed_event += self.__on_window_closed
+		self.__hook(window, "Closed", on_closed)
+		self.__hook(window, "Closed", self.__on_window_closed)
+		if self.__memory_policy:
+			self.__hook(window, "IsVisibleChanged", self.__on_activity_changed)
+			self.__hook(window, "StateChanged", self.__on_activity_changed)
 		if not params.get("hide"): window.Show()
+
+	def __hook(self, source: Any, name: str, handler: Callable):
+		event = getattr(source, name)
+		event += handler
+		self.__hooks.append((source, name, handler))
+	def __unhook_all(self):
+		hooks = self.__hooks
+		self.__hooks = []
+		for source, name, handler in reversed(hooks):
+			event = getattr(source, name)
+			try: event -= handler
+			except Exception as e: print_exception(e)
 	
 	def __show(self):
 		self.__window.Show()
@@ -430,6 +678,14 @@ class WebViewWindow:
 	def left(self, value: float):
 		_cross_thread_call(self.__dispatcher, self.__set_left, (value,))
 
+	def schedule_set(self, name: WebViewSchedulableProperty, value: float, priority = WebViewDispatchPriority.RENDER, coalesce = True):
+		setter = _schedulable_setters.get(name)
+		if setter is None: raise ValueError(f"Property '{name}' cannot be scheduled.")
+		if not isinstance(priority, WebViewDispatchPriority): raise TypeError("Argument 'priority' must be a WebViewDispatchPriority.")
+		args = (self.__window, value)
+		if coalesce: self.__scheduler.schedule(self.__dispatcher, name, setter, args, priority.value)
+		else: _cross_thread_post(self.__dispatcher, setter, args, priority.value)
+
 	@property
 	def navigate_uri(self): return self.__navigate_uri
 	def __navigate_uri_call(self, value): self.__webview.Source = Uri(value)
@@ -468,10 +724,55 @@ class WebViewWindow:
 	def resizable(self, value: bool):
 		_cross_thread_call(self.__dispatcher, self.__set_resizable, (value,))
 
-	def __on_window_closed(self, _, args: EventArgs):
+	def __is_active(self):
+		window = self.__window
+		return window.IsVisible and window.WindowState != WindowState.Minimized
+	def __set_webview_visible(self, visible: bool):
+		self.__webview.Visibility = Visibility.Visible if visible else Visibility.Hidden
+	def __on_activity_changed(self, *_):
+		policy = self.__memory_policy
+		if policy: policy.set_active(self, self.__is_active())
+
+	def __on_window_closed(self, window: Window, args: EventArgs):
 		self.__closed = True
+		self.__closed_at = perf_counter()
+		if self.__memory_policy: self.__memory_policy.untrack(self)
 		self.__dispatcher = None
+		self.__script_calls.reject_all("WindowClosedError", "The window was closed before the call completed.")
+		for capture in self.__captures: capture.stop()
+		self.__captures.clear()
+		self.__clear_subscriptions()
+		self.__file_resources.clear()
 		self.__on_closed.trigger(self)
+		self.__release(window)
+	def __release(self, window: Window):
+		self.__unhook_all()
+		bridge = self.__bridge
+		if bridge:
+			try:
+				core = self.__webview.CoreWebView2
+				if core: bridge.release(core)
+			except Exception as e: print_exception(e)
+		self.__message_notifier.remove_all_handlers()
+		self.__on_closed.remove_all_handlers()
+		_window_map.pop(window, None)
+
+	def resource_report(self):
+		bridge = self.__bridge
+		return {
+			"uri": self.__navigate_uri,
+			"closed": self.__closed,
+			"closed_for": None if self.__closed_at is None else perf_counter() - self.__closed_at,
+			"event_hooks": len(self.__hooks),
+			"bridge_handlers": bridge.handlers if bridge else 0,
+			"bridge_in_flight": bridge.statistics["in_flight"] if bridge else 0,
+			"pending_script_calls": self.__script_calls.pending,
+			"message_handlers": self.__message_notifier.handler_count,
+			"closed_handlers": self.__on_closed.handler_count,
+			"topics": len(self.__topics),
+			"file_resources": len(self.__file_resources),
+			"captures": len(self.__captures)
+		}
 
 	def __on_new_window_request(self, _: CoreWebView2, args: CoreWebView2NewWindowRequestedEventArgs):
 		args.Handled = True
@@ -480,20 +781,78 @@ class WebViewWindow:
 		args.State = CoreWebView2PermissionState.Allow
 
 	def __on_navigation_start(self, _: WebView2, args: CoreWebView2NavigationStartingEventArgs):
-		print("Webview navigation started: " + args.Uri)
+		self.__timeline.navigation_started(args.NavigationId, args.Uri)
+		if self.__debug_enabled: print("Webview navigation started: " + args.Uri)
 
 	def __on_navigation_completed(self, _: WebView2, args: CoreWebView2NavigationCompletedEventArgs):
-		print("Webview navigation completed, status: " + str(args.HttpStatusCode))
+		self.__timeline.navigation_completed(args.NavigationId, args.IsSuccess, args.HttpStatusCode)
+		if self.__debug_enabled: print("Webview navigation completed, status: " + str(args.HttpStatusCode))
+
+	def __on_content_loading(self, _: CoreWebView2, args: CoreWebView2ContentLoadingEventArgs):
+		self.__script_calls.reject_all("NavigationError", "The page navigated away before the call completed.")
+		self.__clear_subscriptions()
+		self.__file_resources.clear()
+
+	def __on_web_resource_requested(self, core: CoreWebView2, args: CoreWebView2WebResourceRequestedEventArgs):
+		uri = args.Request.Uri
+		if not is_file_resource(uri): return
+		dispatcher = self.__dispatcher
+		respond_file_request(args, core.Environment, self.__file_resources.resolve(uri), lambda action: _cross_thread_post(dispatcher, action))
+
+	def register_file_resource(self, path: str, ttl: Optional[float] = None):
+		return self.__file_resources.register(path, ttl)
+	def revoke_file_resource(self, url: str):
+		return self.__file_resources.revoke(url)
+
+	def __start_capture(self, sink: FrameSink, fps: float, format: CaptureFormat):
+		core = self.__webview.CoreWebView2
+		if not core:
+			sink.close()
+			raise Exception("WebView is not initialized.")
+		capture = FrameCapture(core, sink, fps, format)
+		captures = self.__captures
+		for item in [item for item in captures if not item.running]: captures.remove(item)
+		captures.add(capture)
+		capture.start(self.__window.Dispatcher)
+		return capture
+	def capture(self, fps: float = 10, format = CaptureFormat.PNG, max_pending: int = 2):
+		return _cross_thread_call(self.__dispatcher, self.__start_capture, (AsyncFrameSink(get_running_loop(), max_pending), fps, format))
+	def capture_to_directory(self, directory: str, fps: float = 10, format = CaptureFormat.PNG, max_pending: int = 8):
+		return _cross_thread_call(self.__dispatcher, self.__start_capture, (FileFrameSink(directory, max_pending), fps, format))
+	def stop_capture(self, capture: FrameCapture):
+		_cross_thread_call(self.__dispatcher, capture.stop)
+
+	def __on_dom_content_loaded(self, _: CoreWebView2, args: CoreWebView2DOMContentLoadedEventArgs):
+		self.__timeline.dom_content_loaded(args.NavigationId)
+
+	@property
+	def timeline(self): return self.__timeline
+	@property
+	def bridge_statistics(self):
+		bridge = self.__bridge
+		return bridge.statistics if bridge else None
 
-	def __on_webview_ready(self, init_params:WebViewWindowInitializeParameters, webview: WebView2, args: CoreWebView2InitializationCompletedEventArgs):
+	def __on_webview_ready(self, webview: WebView2, args: CoreWebView2InitializationCompletedEventArgs):
+		init_params = self.__init_params
 		if not args.IsSuccess:
 			print(args.InitializationException)
 			raise WebViewException(args.InitializationException)
 		core = webview.CoreWebView2
 		assert core
-		core.NewWindowRequested += self.__on_new_window_request
-		if init_params.web_api_permission_bypass: core.PermissionRequested += self.__on_permission_requested
-		Bridge(core, self.__api)
+		self.__hook(core, "NewWindowRequested", self.__on_new_window_request)
+		self.__hook(core, "ContentLoading", self.__on_content_loading)
+		self.__hook(core, "DOMContentLoaded", self.__on_dom_content_loaded)
+		core.AddWebResourceRequestedFilter(FILE_RESOURCE_FILTER, CoreWebView2WebResourceContext.All)
+		self.__hook(core, "WebResourceRequested", self.__on_web_resource_requested)
+		if init_params.web_api_permission_bypass: self.__hook(core, "PermissionRequested", self.__on_permission_requested)
+		if self.__memory_policy: self.__memory_policy.track(self, core, self.__is_active(), self.__set_webview_visible)
+		natives = store_natives(self.__get_store) if init_params.store_api else {}
+		if init_params.file_picker_api: natives.update({
+			"showOpenFilePicker": self.__native_picker(OpenFilePicker),
+			"showSaveFilePicker": self.__native_picker(SaveFilePicker),
+			"showDirectoryPicker": self.__native_picker(DirectoryPicker)
+		})
+		self.__bridge = Bridge(core, self.__api, self.__bridge_scheduler, init_params.bridge_window_max_in_flight, self.__timeline.api_called, natives)
 		debug_enabled = init_params.debug_enabled
 		settings = core.Settings
 		settings.AreBrowserAcceleratorKeysEnabled = settings.AreDefaultContextMenusEnabled = settings.AreDevToolsEnabled = debug_enabled
@@ -523,7 +882,18 @@ class WebViewWindow:
 		assert self.__webview.CoreWebView2
 		self.__webview.CoreWebView2.PostWebMessageAsJson(message)
 	def post_message(self, message: Any):
-		_cross_thread_call(self.__dispatcher, self.__post_message, (dumps(message, ensure_ascii=False, default=serialize_object),))
+		_cross_thread_call(self.__dispatcher, self.__post_message, (encode(message),))
+
+	def __post_call(self, id: int, message: str):
+		try: self.__post_message(message)
+		except Exception as e: self.__script_calls.settle(id, False, (e.__class__.__name__, str(e)))
+	async def call(self, name: str, *args: Any, timeout: Optional[float] = None):
+		[id, future] = self.__script_calls.create()
+		try: _cross_thread_post(self.__dispatcher, self.__post_call, (id, envelope(MESSAGE_CALL, id, name, args)))
+		except BaseException as e:
+			future.cancel()
+			raise e
+		return await (future if timeout is None else wait_for(future, timeout))
 	
 	def __execute_javascript(self, script: str):
 		assert self.__webview.CoreWebView2
@@ -544,28 +914,74 @@ class WebViewWindow:
 		task.ContinueWith(_execute_javascript_delegate(next))
 		return future
 	def __on_javascript_message(self, _, args):
-		self.__message_notifier.trigger(loads(args.WebMessageAsJson))
+		message = loads(args.WebMessageAsJson)
+		if type(message) is not dict or ENVELOPE_KEY not in message:
+			self.__message_notifier.trigger(message)
+			return
+		message = message[ENVELOPE_KEY]
+		if type(message) is not list or not message: return
+		kind = message[0]
+		if kind == MESSAGE_BRIDGE_READY: self.__timeline.bridge_ready()
+		elif kind == MESSAGE_NAVIGATION_TIMING: self.__timeline.navigation_timing(message[1])
+		elif kind == MESSAGE_CALL_RESULT: self.__script_calls.settle(message[1], message[2], message[3])
+		elif kind == MESSAGE_SUBSCRIBE: self.__subscribe(message[1])
+		elif kind == MESSAGE_UNSUBSCRIBE: self.__unsubscribe(message[1])
+	def __subscribe(self, topic: str):
+		if topic in self.__topics: return
+		self.__topics.add(topic)
+		self.__on_subscription_changed(self, topic, True, self.__post_message)
+	def __unsubscribe(self, topic: str):
+		if topic not in self.__topics: return
+		self.__topics.remove(topic)
+		self.__on_subscription_changed(self, topic, False, self.__post_message)
+	def __clear_subscriptions(self):
+		topics = self.__topics
+		self.__topics = set()
+		for topic in topics: self.__on_subscription_changed(self, topic, False, self.__post_message)
+	@property
+	def topics(self): return frozenset(self.__topics)
 	@property
 	def message_notifier(self):
 		return self.__message_notifier
 
-	def show_open_file_picker(self, **options: Unpack[OpenFilePickerOptions]):
-		picker = _cross_thread_call(self.__dispatcher, OpenFilePicker)
-		picker.set_options(options)
-		_cross_thread_call(self.__dispatcher, picker.show_dialog, (self.__window,))
-		return picker.parse_result()
-
-	def show_save_file_picker(self, **options: Unpack[SaveFilePickerOptions]):
-		picker = _cross_thread_call(self.__dispatcher, SaveFilePicker)
-		picker.set_options(options)
-		_cross_thread_call(self.__dispatcher, picker.show_dialog, (self.__window,))
-		return picker.parse_result()
-	
-	def show_directory_picker(self, **options: Unpack[DirectoryPickerOptions]):
-		picker = _cross_thread_call(self.__dispatcher, DirectoryPicker)
-		picker.set_options(options)
-		_cross_thread_call(self.__dispatcher, picker.show_dialog, (self.__window,))
-		return picker.parse_result()
+	def __show_picker(self, picker_class: Type[OpenFilePicker | SaveFilePicker | DirectoryPicker], options: Any):
+		result = run_picker(picker_class, options, self.__window)
+		if isinstance(result, OpenFileResult) and options.get("share_with_page", False):
+			result.urls = [self.__file_resources.register(file) for file in result.files]
+			if not result.multiple: result.url = result.urls[0]
+		return result
+	def __show_picker_later(self, picker_class: Type[OpenFilePicker | SaveFilePicker | DirectoryPicker], options: Any, complete: Callable[[bool, Any], None]):
+		try: result = self.__show_picker(picker_class, options)
+		except Exception as e:
+			complete(False, e)
+			return
+		complete(True, result)
+	def __await_picker(self, picker_class: Type[OpenFilePicker | SaveFilePicker | DirectoryPicker], options: Any):
+		loop = get_running_loop()
+		future = loop.create_future()
+		def complete(success: bool, value: Any): loop.call_soon_threadsafe(_settle_future, future, success, value)
+		_cross_thread_post(self.__dispatcher, self.__show_picker_later, (picker_class, options, complete))
+		return future
+	def __native_picker(self, picker_class: Type[OpenFilePicker | SaveFilePicker | DirectoryPicker]):
+		def native(args: List[Any], complete: Callable[[bool, Any], None]):
+			options = {_snake_case(key): value for key, value in (args[0] if args and args[0] else {}).items()}
+			_cross_thread_post(self.__dispatcher, self.__show_picker_later, (picker_class, options, complete))
+		return native
+
+	def show_open_file_picker(self, **options: Unpack[OpenFilePickerOptions]) -> Optional[OpenFileResult]:
+		return _cross_thread_call(self.__dispatcher, self.__show_picker, (OpenFilePicker, options))
+	def show_open_file_picker_await(self, **options: Unpack[OpenFilePickerOptions]) -> Future[Optional[OpenFileResult]]:
+		return self.__await_picker(OpenFilePicker, options)
+
+	def show_save_file_picker(self, **options: Unpack[SaveFilePickerOptions]) -> Optional[SaveFileResult]:
+		return _cross_thread_call(self.__dispatcher, self.__show_picker, (SaveFilePicker, options))
+	def show_save_file_picker_await(self, **options: Unpack[SaveFilePickerOptions]) -> Future[Optional[SaveFileResult]]:
+		return self.__await_picker(SaveFilePicker, options)
+
+	def show_directory_picker(self, **options: Unpack[DirectoryPickerOptions]) -> Optional[DirectoryResult]:
+		return _cross_thread_call(self.__dispatcher, self.__show_picker, (DirectoryPicker, options))
+	def show_directory_picker_await(self, **options: Unpack[DirectoryPickerOptions]) -> Future[Optional[DirectoryResult]]:
+		return self.__await_picker(DirectoryPicker, options)
 
 _running_application: Optional[WebViewApplication] = None
 def get_running_application():
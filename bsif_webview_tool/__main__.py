@@ -5,6 +5,8 @@ def print_help():
 Commands:
     help: Show this help message.
     install_runtimes: Install Webview2 and .Net Framework.
+    benchmark [-o output.json] [-n iterations]: Run the standard benchmark scenarios and print or save the JSON results.
+    profile [-o report.txt] [-i interval_ms] [-d seconds] <script> [args...]: Run an application script with a sampling profiler on its bridge handlers.
 """)
 	exit()
 
@@ -18,18 +20,19 @@ if not args:
 	print_help()
 
 def install_runtimes():
-	from .environment import check_environment, install_webview, install_dotnet_runtime
+	from .environment import check_environment, download_runtimes, install_webview, install_dotnet_runtime
 	env = check_environment()
-	if env['webview']:
-		print("Webview2 is already installed.")
-	else:
-		print("Installing Webview2...")
-		install_webview()
-	if env['dotnet']:
-		print(".Net Framework is already installed.")
-	else:
-		print("Installing .Net Framework...")
-		install_dotnet_runtime()
+	if env['webview']: print("Webview2 is already installed.")
+	if env['dotnet']: print(".Net Framework is already installed.")
+	if not env['webview'] or not env['dotnet']:
+		print("Downloading installers...")
+		installers = download_runtimes(not env['webview'], not env['dotnet'])
+		if 'webview' in installers:
+			print("Installing Webview2...")
+			install_webview(installers['webview'])
+		if 'dotnet' in installers:
+			print("Installing .Net Framework...")
+			install_dotnet_runtime(installers['dotnet'])
 	print("Runtimes installation completed.")
 
 match args[0]:
@@ -37,6 +40,12 @@ match args[0]:
 		print_help()
 	case "install_runtimes":
 		install_runtimes()
+	case "benchmark":
+		from .benchmark import main
+		main(args[1:])
+	case "profile":
+		from .profiler import main
+		main(args[1:])
 	case _:
 		print("Unknown command.\n")
 		print_help()
@@ -0,0 +1,162 @@
+from asyncio import create_task, new_event_loop, sleep
+from json import dumps
+from os.path import join
+from platform import platform, python_version
+from statistics import mean, median
+from subprocess import run
+from sys import executable
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import perf_counter
+from traceback import print_exception
+from typing import Any, Dict, Iterable, List
+
+BENCHMARK_HOST = "benchmark.webview"
+BENCHMARK_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>bsif_webview benchmark</title></head>
+<body>
+<script>
+	let received = 0, target = Infinity, resolveTarget = null;
+	webview.addEventListener("message", function () {
+		if (++received >= target) resolveTarget(received);
+	});
+	webview.expose("bridgeRoundTrips", async function (count) {
+		let start = performance.now();
+		for (let i = 0; i < count; i++) webview.syncApi.echo(i);
+		const sync = performance.now() - start;
+		start = performance.now();
+		for (let i = 0; i < count; i++) await webview.asyncApi.echo(i);
+		return { sync, async: performance.now() - start };
+	});
+	webview.expose("waitMessages", function (total) {
+		if (received >= total) return received;
+		target = total;
+		return new Promise(function (resolve) { resolveTarget = resolve; });
+	});
+</script>
+</body>
+</html>"""
+DEFAULT_PAYLOAD_SIZES = (16, 1024, 65536)
+
+def summarize(samples: List[float]):
+	ordered = sorted(samples)
+	return {
+		"count": len(ordered),
+		"min": ordered[0],
+		"median": median(ordered),
+		"mean": mean(ordered),
+		"max": ordered[-1]
+	}
+
+def measure_import_time(iterations: int):
+	samples = []
+	for _ in range(iterations):
+		output = run([executable, "-c", "from time import perf_counter as p; s = p(); import bsif_webview; print(p() - s)"], capture_output=True, check=True).stdout
+		samples.append(float(output) * 1000)
+	return summarize(samples)
+
+async def wait_for_navigation(window, count: int, timeout: float = 30):
+	deadline = perf_counter() + timeout
+	while perf_counter() < deadline:
+		records = window.timeline.records
+		if len(records) >= count and "navigation_completed" in records[count - 1].marks: return
+		await sleep(0.005)
+	raise TimeoutError("Navigation did not complete in time.")
+
+async def run_window_scenarios(app, page_uri: str, iterations: int, round_trips: int, payload_sizes: Iterable[int], messages: int):
+	results: Dict[str, Any] = {}
+
+	samples = []
+	for _ in range(iterations):
+		start = perf_counter()
+		window = app.create_window(hide=True)
+		samples.append((perf_counter() - start) * 1000)
+		window.close()
+	results["window_creation"] = summarize(samples)
+
+	window = app.create_window(initial_uri=page_uri)
+	await wait_for_navigation(window, 1)
+	for index in range(iterations):
+		window.navigate_uri = page_uri
+		await wait_for_navigation(window, index + 2)
+	results["page_load"] = window.timeline.summary()
+	results["page_load_cold"] = window.timeline.summary(cold=True)
+	results["page_load_warm"] = window.timeline.summary(cold=False)
+
+	sync_samples = []
+	async_samples = []
+	for _ in range(iterations):
+		timing = await window.call("bridgeRoundTrips", round_trips, timeout=60)
+		sync_samples.append(timing["sync"] / round_trips)
+		async_samples.append(timing["async"] / round_trips)
+	results["bridge_sync_round_trip"] = summarize(sync_samples)
+	results["bridge_async_round_trip"] = summarize(async_samples)
+
+	throughput = {}
+	total = 0
+	for size in payload_sizes:
+		payload = "x" * size
+		samples = []
+		for _ in range(iterations):
+			total += messages
+			start = perf_counter()
+			waiting = create_task(window.call("waitMessages", total, timeout=60))
+			for _ in range(messages): window.post_message(payload)
+			await waiting
+			samples.append(messages / (perf_counter() - start))
+		throughput[str(size)] = summarize(samples)
+	results["post_message_throughput"] = throughput
+	window.close()
+	return results
+
+def run_benchmarks(iterations: int = 10, round_trips: int = 200, payload_sizes: Iterable[int] = DEFAULT_PAYLOAD_SIZES, messages: int = 200):
+	from bsif_webview import WebViewApplication, WebViewVirtualHost
+	payload_sizes = tuple(payload_sizes)
+	try:
+		from importlib.metadata import version
+		package_version = version("bsif-webview2")
+	except Exception:
+		package_version = None
+	results: Dict[str, Any] = {
+		"version": package_version,
+		"python": python_version(),
+		"platform": platform(),
+		"parameters": {"iterations": iterations, "round_trips": round_trips, "payload_sizes": list(payload_sizes), "messages": messages},
+		"import_time": measure_import_time(iterations)
+	}
+	with TemporaryDirectory() as directory:
+		with open(join(directory, "index.html"), "w", encoding="utf-8") as file: file.write(BENCHMARK_PAGE)
+		app = WebViewApplication(
+			virtual_hosts=(WebViewVirtualHost(directory, BENCHMARK_HOST),),
+			api={"echo": lambda value = None: value}
+		)
+		error: List[BaseException] = []
+		def scenarios():
+			loop = new_event_loop()
+			try: results.update(loop.run_until_complete(run_window_scenarios(app, f"https://{BENCHMARK_HOST}/index.html", iterations, round_trips, payload_sizes, messages)))
+			except BaseException as e: error.append(e)
+			finally:
+				loop.close()
+				app.stop()
+		app.start(lambda _: Thread(target=scenarios, daemon=True).start())
+	if error: raise error[0]
+	return results
+
+def main(args: List[str]):
+	from argparse import ArgumentParser
+	parser = ArgumentParser(prog="python -m bsif_webview_tool benchmark")
+	parser.add_argument("-o", "--output", help="Write the JSON results to this file.")
+	parser.add_argument("-n", "--iterations", type=int, default=10)
+	parser.add_argument("--round-trips", type=int, default=200)
+	parser.add_argument("--messages", type=int, default=200)
+	parser.add_argument("--payload-sizes", type=lambda text: tuple(int(item) for item in text.split(",")), default=DEFAULT_PAYLOAD_SIZES)
+	options = parser.parse_args(args)
+	try: results = run_benchmarks(options.iterations, options.round_trips, options.payload_sizes, options.messages)
+	except Exception as e:
+		print_exception(e)
+		exit(1)
+	output = dumps(results, indent="\t")
+	if options.output:
+		with open(options.output, "w", encoding="utf-8") as file: file.write(output)
+	else: print(output)
@@ -1,11 +1,22 @@
-from os import getenv, remove
-from os.path import join, dirname, abspath
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from hashlib import sha256
+from os import getenv, makedirs, remove, replace
+from os.path import exists, getsize, join, dirname, abspath
 from platform import system
+from re import compile
 from subprocess import run
-from urllib.request import urlopen
+from typing import Dict, Optional
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
 from winreg import OpenKey, QueryValueEx, HKEY_LOCAL_MACHINE
 
 BUNDLED_DOTNET_RUNTIME = join(abspath(join(dirname(__file__), "..", "bsif_webview")), "libs", "dotnet")
+CACHE_DIRECTORY = join(getenv("LOCALAPPDATA") or getenv("TEMP") or ".", "bsif_webview", "installers")
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+CONTENT_RANGE_REGEX = compile(r"^bytes (\d+)-\d+/(?:\d+|\*)$")
+WEBVIEW_INSTALLER = ("https://go.microsoft.com/fwlink/p/?LinkId=2124703", "MicrosoftEdgeWebview2Setup.exe")
+DOTNET_INSTALLER = ("https://go.microsoft.com/fwlink/?linkid=2203305", "DotneFramework4.8.1.exe")
 
 class DotNetRuntimeInfo:
 	def __init__(self, info_string: str):
@@ -17,13 +28,19 @@ class DotNetRuntimeInfo:
 		self.version = tuple(map(int, version_string.split(".")))
 		self.location = join(info_string[end + 2:-1], version_string)
 	@classmethod
-	def list(cls):
-		try:
-			return [cls(info) for info in run("dotnet --list-runtimes", capture_output=True).stdout.decode("utf-8").splitlines() if info]
-		except:
-			return []
+	def list(cls, refresh: bool = False):
+		if refresh: _list_dotnet_runtimes.cache_clear()
+		return [cls(info) for info in _list_dotnet_runtimes()]
 
-def check_environment():
+@cache
+def _list_dotnet_runtimes():
+	try:
+		return tuple(info for info in run("dotnet --list-runtimes", capture_output=True).stdout.decode("utf-8").splitlines() if info)
+	except:
+		return ()
+
+@cache
+def _check_environment():
 	os = system() == "Windows"
 	result={
 		"os": os,
@@ -48,18 +65,86 @@ def check_environment():
 	except: pass
 	return result
 
-def install_webview():
-	resource = urlopen("https://go.microsoft.com/fwlink/p/?LinkId=2124703")
-	path = join(getenv("TEMP"), "MicrosoftEdgeWebview2Setup.exe") # type: ignore
-	with open(path, "wb") as file: file.write(resource.read())
-	code = run(path).returncode
-	remove(path)
+def check_environment(refresh: bool = False):
+	if refresh: _check_environment.cache_clear()
+	return dict(_check_environment())
+
+def file_sha256(path: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE):
+	digest = sha256()
+	with open(path, "rb") as file:
+		while chunk := file.read(chunk_size): digest.update(chunk)
+	return digest
+
+def _validator(response):
+	etag = response.headers.get("ETag")
+	if etag and not etag.startswith("W/"): return etag
+	return response.headers.get("Last-Modified")
+
+def _range_start(response):
+	match = CONTENT_RANGE_REGEX.match((response.headers.get("Content-Range") or "").strip())
+	return int(match[1]) if match else None
+
+def _open_download(url: str, offset: int, validator: Optional[str]):
+	if offset and validator:
+		try: response = urlopen(Request(url, headers={"Range": f"bytes={offset}-", "If-Range": validator}))
+		except HTTPError as error:
+			if error.code != 416: raise error
+		else:
+			if response.status == 206 and _range_start(response) == offset: return response, offset
+			if response.status == 200: return response, 0
+			response.close()
+	return urlopen(url), 0
+
+def download(url: str, file_name: str, checksum: Optional[str] = None, cache_directory: str = CACHE_DIRECTORY, chunk_size: int = DOWNLOAD_CHUNK_SIZE):
+	makedirs(cache_directory, exist_ok=True)
+	path = join(cache_directory, file_name)
+	checksum_path = path + ".sha256"
+	checksum = checksum.lower() if checksum else None
+	if exists(path) and exists(checksum_path):
+		with open(checksum_path) as file: recorded = file.read().strip()
+		if (checksum is None or recorded == checksum) and file_sha256(path, chunk_size).hexdigest() == recorded: return path
+	partial_path = path + ".part"
+	validator_path = partial_path + ".validator"
+	offset = getsize(partial_path) if exists(partial_path) else 0
+	validator = None
+	if offset and exists(validator_path):
+		with open(validator_path) as file: validator = file.read().strip() or None
+	response, offset = _open_download(url, offset, validator)
+	with response:
+		if not offset:
+			validator = _validator(response)
+			if validator:
+				with open(validator_path, "w") as file: file.write(validator)
+			elif exists(validator_path): remove(validator_path)
+		digest = file_sha256(partial_path, chunk_size) if offset else sha256()
+		with open(partial_path, "ab" if offset else "wb") as file:
+			while chunk := response.read(chunk_size):
+				file.write(chunk)
+				digest.update(chunk)
+	result = digest.hexdigest()
+	if exists(validator_path): remove(validator_path)
+	if checksum and result != checksum:
+		remove(partial_path)
+		raise ValueError(f"Checksum mismatch for '{file_name}': expected {checksum}, got {result}.")
+	replace(partial_path, path)
+	with open(checksum_path, "w") as file: file.write(result)
+	return path
+
+def download_runtimes(webview: bool = True, dotnet: bool = True, cache_directory: str = CACHE_DIRECTORY) -> Dict[str, str]:
+	installers = {}
+	if webview: installers["webview"] = WEBVIEW_INSTALLER
+	if dotnet: installers["dotnet"] = DOTNET_INSTALLER
+	if not installers: return {}
+	with ThreadPoolExecutor(len(installers)) as executor:
+		futures = {name: executor.submit(download, url, file_name, None, cache_directory) for name, (url, file_name) in installers.items()}
+		return {name: future.result() for name, future in futures.items()}
+
+def install_webview(installer: Optional[str] = None):
+	code = run(installer or download(*WEBVIEW_INSTALLER)).returncode
+	check_environment(True)
 	return code
 
-def install_dotnet_runtime():
-	resource = urlopen("https://go.microsoft.com/fwlink/?linkid=2203305")
-	path = join(getenv("TEMP"), "DotneFramework4.8.1.exe") # type: ignore
-	with open(path, "wb") as file: file.write(resource.read())
-	code = run(path, shell=True).returncode
-	remove(path)
+def install_dotnet_runtime(installer: Optional[str] = None):
+	code = run(installer or download(*DOTNET_INSTALLER), shell=True).returncode
+	check_environment(True)
 	return code
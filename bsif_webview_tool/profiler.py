@@ -0,0 +1,111 @@
+from collections import Counter
+from os.path import abspath
+from runpy import run_path
+from sys import _current_frames, argv
+from threading import Event, Thread, get_ident
+from time import perf_counter
+from traceback import print_exception
+from types import CodeType, FrameType
+from typing import Counter as CounterType, List, Optional, Set, Tuple
+
+type FrameKey = Tuple[str, int, str]
+
+def bridge_entry_codes() -> Set[CodeType]:
+	from bsif_webview.bridge import Bridge, async_call_coroutine, async_call_thread
+	return {
+		async_call_thread.__code__,
+		async_call_coroutine.__code__,
+		Bridge._Bridge__sync_call_handler.__code__, # type: ignore
+		Bridge._Bridge__async_call_handler.__code__ # type: ignore
+	}
+
+class BridgeProfiler:
+	def __init__(self, interval: float = 0.005, entry_codes: Optional[Set[CodeType]] = None):
+		self.interval = interval
+		self.__entry_codes = entry_codes
+		self.__stacks: CounterType[Tuple[FrameKey, ...]] = Counter()
+		self.__samples = 0
+		self.__duration = 0.0
+		self.__stop = Event()
+		self.__thread: Optional[Thread] = None
+
+	def __handler_stack(self, frame: Optional[FrameType]):
+		entry_codes = self.__entry_codes
+		assert entry_codes is not None
+		stack: List[FrameKey] = []
+		while frame is not None:
+			code = frame.f_code
+			stack.append((code.co_filename, frame.f_lineno, code.co_name))
+			if code in entry_codes: return tuple(reversed(stack))
+			frame = frame.f_back
+		return None
+
+	def __run(self):
+		own = get_ident()
+		stop = self.__stop
+		stacks = self.__stacks
+		start = perf_counter()
+		while not stop.wait(self.interval):
+			for ident, frame in _current_frames().items():
+				if ident == own: continue
+				stack = self.__handler_stack(frame)
+				if stack:
+					stacks[stack] += 1
+					self.__samples += 1
+		self.__duration += perf_counter() - start
+
+	def start(self):
+		if self.__thread: raise RuntimeError("Profiler is already running.")
+		if self.__entry_codes is None: self.__entry_codes = bridge_entry_codes()
+		self.__stop.clear()
+		thread = self.__thread = Thread(target=self.__run, name="BridgeProfiler", daemon=True)
+		thread.start()
+	def stop(self):
+		thread = self.__thread
+		if not thread: return
+		self.__stop.set()
+		thread.join()
+		self.__thread = None
+
+	def report(self, limit: int = 30):
+		total = self.__samples
+		inclusive: CounterType[FrameKey] = Counter()
+		exclusive: CounterType[FrameKey] = Counter()
+		for stack, count in self.__stacks.items():
+			for key in set(stack): inclusive[key] += count
+			exclusive[stack[-1]] += count
+		def line(key: FrameKey, count: int):
+			return f"{count:>8} {count * 100 / total:6.2f}%  {key[2]} ({key[0]}:{key[1]})"
+		lines = [f"Bridge handler samples: {total} over {self.__duration:.2f}s (interval {self.interval * 1000:g} ms)"]
+		if not total: return "\n".join(lines)
+		lines.append("\nSelf time:")
+		lines.extend(line(key, count) for key, count in exclusive.most_common(limit))
+		lines.append("\nInclusive time:")
+		lines.extend(line(key, count) for key, count in inclusive.most_common(limit))
+		lines.append("\nHottest stacks:")
+		for stack, count in self.__stacks.most_common(min(limit, 10)):
+			lines.append(f"{count:>8} {count * 100 / total:6.2f}%")
+			lines.extend(f"           {key[2]} ({key[0]}:{key[1]})" for key in stack)
+		return "\n".join(lines)
+
+def main(args: List[str]):
+	from argparse import ArgumentParser, REMAINDER
+	parser = ArgumentParser(prog="python -m bsif_webview_tool profile")
+	parser.add_argument("-o", "--output", help="Write the report to this file.")
+	parser.add_argument("-i", "--interval", type=float, default=5, help="Sampling interval in milliseconds.")
+	parser.add_argument("-d", "--duration", type=float, help="Stop sampling after this many seconds.")
+	parser.add_argument("script", help="Application script to run.")
+	parser.add_argument("script_args", nargs=REMAINDER)
+	options = parser.parse_args(args)
+	profiler = BridgeProfiler(options.interval / 1000)
+	profiler.start()
+	if options.duration: Thread(target=lambda: (Event().wait(options.duration), profiler.stop()), daemon=True).start()
+	argv[:] = [options.script, *options.script_args]
+	try: run_path(abspath(options.script), run_name="__main__")
+	except SystemExit: pass
+	except BaseException as e: print_exception(e)
+	finally: profiler.stop()
+	report = profiler.report()
+	if options.output:
+		with open(options.output, "w", encoding="utf-8") as file: file.write(report)
+	else: print(report)